@@ -1,110 +1,253 @@
-import { join } from "path";
-import { writeFileSync, mkdirSync, existsSync, readFileSync } from "fs";
+import { join, relative } from "path";
+import { writeFileSync, mkdirSync, existsSync, readFileSync, readdirSync, renameSync } from "fs";
+import { parseArgs } from "util";
+import { spawn } from "child_process";
 import { launch } from "chrome-launcher";
-import puppeteer from "puppeteer";
-import dataContent from "./siteMap/data.json";
-import lighthouse from "lighthouse";
-import generateSiteMap from "./getSiteMap";
+import { SESSION_EXPIRED_EXIT_CODE, type AuditRequest } from "./lighthouseRunner";
+import generateSiteMap, { loadSiteMap, markAudited, SITEMAP_FILE } from "./getSiteMap";
+import { SessionManager } from "./session";
 import dotenv from "dotenv";
 dotenv.config();
 
+// Audits run at once, each in its own process on its own Chrome instance. Keep this at
+// or below the number of CPU cores so the runs do not slow each other down.
+const AUDIT_CONCURRENCY = Number(process.env.AUDIT_CONCURRENCY ?? 4);
+// Extra attempts for a failed audit, waiting AUDIT_RETRY_DELAY_MS, then twice that, ...
+const AUDIT_RETRIES = Number(process.env.AUDIT_RETRIES ?? 2);
+const AUDIT_RETRY_DELAY_MS = Number(process.env.AUDIT_RETRY_DELAY_MS ?? 5000);
+// Report formats to save: "html", "json" (the Lighthouse result as .json.gz) or both
+const REPORT_FORMATS = (process.env.REPORT_FORMATS ?? "html,json").split(",").map((format) => format.trim());
+// Keep only what the metrics extractor reads in the .json.gz: scores, numeric audit values and timing
+const TRIM_JSON = (process.env.TRIM_JSON ?? "true") === "true";
 
-const ERP_USER = process.env.ERP_EMAIL
-const ERP_PWD = process.env.ERP_PWD
+type Source = { url: string; pageName: string };
+type Viewport = { width: number; height: number };
+type Mode = "navigation" | "snapshot" | "timespan";
+type AuditJob = { source: Source; mode: Mode; viewport: Viewport; modeFolder: string; key: string };
+type AuditOptions = { resume?: string; pages?: string[]; modes?: Mode[]; viewports?: string[]; crawl?: boolean; newPages?: boolean };
+type RunManifest = { startedAt: string; completed: Record<string, { finishedAt: string; files: string[] }> };
+
+const MODES: readonly Mode[] = ["navigation", "snapshot", "timespan"];
+const FORMATS: readonly string[] = ["html", "json"];
+// Runs one audit per process, see runAuditProcess
+const AUDIT_RUNNER = join(import.meta.dir, "lighthouseRunner.ts");
+// Records the audits of a run that finished, so an interrupted run can be resumed in place
+const RUN_MANIFEST = "run_manifest.json";
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
 
 export class LightHouseWrapper {
   private currentDateTime = new Date().toISOString();
   private reportFolder = join(process.cwd(), `Reports/${this.currentDateTime}`);
-  private cookieFile = join(process.cwd(), "cookies.txt");
-  private chrome: any;
-  private browser: any;
+  // One login shared by the crawl and every audit, refreshed when it expires
+  private session = new SessionManager();
+  private chromePool: any[] = [];
+  private manifest: RunManifest = { startedAt: this.currentDateTime, completed: {} };
+
+  constructor(private options: AuditOptions = {}) {
+    if (options.resume) {
+      this.reportFolder = this.getResumeFolder(options.resume);
+      this.manifest = this.loadManifest();
+    }
+  }
 
   async auditSite(): Promise<void> {
-    // generateSiteMap();
+    if (this.options.crawl) {
+      await generateSiteMap(undefined, this.session);
+    }
+    const allJobs = this.getJobs(await this.getUrls());
+    const jobs = allJobs.filter((job) => !this.isCompleted(job));
+    console.log(`Report folder: ${this.reportFolder} (${jobs.length} audits to run, ${allJobs.length - jobs.length} already done)`);
+    if (jobs.length === 0) {
+      return;
+    }
+    this.saveManifest();
+
     await this.setup();
-    const urls = await this.getUrls();
-    const viewports = this.getViewports();
-    const modes = ["navigation", "snapshot", "timespan"] as const;
+    const failed: AuditJob[] = [];
+
+    try {
+      // Each worker owns one Chrome instance and takes the next job when it is free,
+      // so no two audits ever share a browser
+      let next = 0;
+      await Promise.all(
+        this.chromePool.map(async (_, slot) => {
+          while (next < jobs.length) {
+            const job = jobs[next++];
+            if (await this.runWithRetry(job, slot)) {
+              this.markCompleted(job);
+              // A page counts as audited once all of its audits in this run are done
+              if (allJobs.every((other) => other.source.url !== job.source.url || this.isCompleted(other))) {
+                markAudited(job.source.url);
+              }
+            } else {
+              failed.push(job);
+            }
+          }
+        })
+      );
+    } finally {
+      await this.teardown();
+    }
+
+    console.log(`Finished ${jobs.length - failed.length} of ${jobs.length} audits.`);
+    for (const job of failed) {
+      console.error(`Failed: ${job.source.url} | Mode: ${job.mode} | Viewport: ${JSON.stringify(job.viewport)}`);
+    }
+    if (failed.length > 0) {
+      console.log(`Run again with --resume ${this.reportFolder} to retry only the failed audits.`);
+    }
+  }
 
-    for (const source of urls) {
-      console.log(`Running audits for page: ${source.pageName}`);
+  getJobs(urls: Source[]): AuditJob[] {
+    const { pages, modes = MODES, viewports: viewportNames } = this.options;
+    const viewports = this.getViewports().filter(
+      (viewport) => !viewportNames || viewportNames.includes(this.getViewportName(viewport))
+    );
+    const jobs: AuditJob[] = [];
 
+    for (const source of urls.filter((source) => !pages || pages.includes(source.pageName.trim()))) {
       for (const mode of modes) {
         const modeFolder = join(this.reportFolder, source.pageName.trim(), `${mode}_mode`);
         this.makeDirectory(modeFolder);
 
         for (const viewport of viewports) {
-          console.log(`Auditing: ${source.url} | Mode: ${mode} | Viewport: ${JSON.stringify(viewport)}`);
-          const options = await this.getBrowserConfig(viewport);
-          await this.runLighthouse(source, options, mode, modeFolder, viewport);
+          const key = `${source.pageName.trim()}/${mode}/${this.getViewportName(viewport)}`;
+          jobs.push({ source, mode, viewport, modeFolder, key });
         }
       }
     }
-
-    await this.teardown();
+    return jobs;
   }
 
-  async runLighthouse(
-    source: { url: string; pageName: string },
-    options: any,
-    mode: "navigation" | "snapshot" | "timespan",
-    modeFolder: string,
-    viewport: { width: number; height: number }
-  ): Promise<void> {
-    const config = {
-      extends: "lighthouse:default",
-      settings: { output: "html", formFactor: options.screenEmulation.mobile ? "mobile" : "desktop" },
-    };
+  getResumeFolder(resume: string): string {
+    if (resume !== "latest") {
+      return resume.startsWith("/") ? resume : join(process.cwd(), resume);
+    }
+    // Run folders are named by ISO timestamp, so the last one sorted is the most recent
+    const reportsRoot = join(process.cwd(), "Reports");
+    const runs = existsSync(reportsRoot)
+      ? readdirSync(reportsRoot).filter((name) => existsSync(join(reportsRoot, name, RUN_MANIFEST))).sort()
+      : [];
+    if (runs.length === 0) {
+      throw new Error(`No run with a ${RUN_MANIFEST} to resume in ${reportsRoot}`);
+    }
+    return join(reportsRoot, runs[runs.length - 1]);
+  }
 
-    // Adjust config settings based on the mode
-    if (mode === "snapshot") {
-      config.settings = { ...config.settings, onlyAudits: ["screenshot-thumbnails"] };
-    } else if (mode === "timespan") {
-      config.settings = { ...config.settings, throttlingMethod: "provided" };
+  loadManifest(): RunManifest {
+    try {
+      return JSON.parse(readFileSync(join(this.reportFolder, RUN_MANIFEST), "utf-8"));
+    } catch (err) {
+      console.error("Error reading run manifest, starting the run over:", err);
+      return { startedAt: this.currentDateTime, completed: {} };
     }
+  }
+
+  isCompleted(job: AuditJob): boolean {
+    const entry = this.manifest.completed[job.key];
+    // Only trust the manifest while the reports it lists are still on disk
+    return !!entry && entry.files.every((file) => existsSync(join(this.reportFolder, file)));
+  }
+
+  getReportName(job: AuditJob): string {
+    return join(job.modeFolder, `${job.source.pageName.trim()}_${job.mode}_${this.getViewportName(job.viewport)}`);
+  }
 
-    const runnerResult = await lighthouse(source.url, { ...options, mode }, config);
-    const reportHtml = runnerResult.report;
+  markCompleted(job: AuditJob): void {
+    const reportName = this.getReportName(job);
+    const files = REPORT_FORMATS.map((format) => relative(this.reportFolder, format === "json" ? `${reportName}.json.gz` : `${reportName}.html`));
+    this.manifest.completed[job.key] = { finishedAt: new Date().toISOString(), files };
+    this.saveManifest();
+  }
 
-    const viewportName = options.screenEmulation.mobile
-      ? "mobile"
-      : viewport.width === 768
-      ? "tablet"
-      : "desktop";
+  saveManifest(): void {
+    // Replace the manifest atomically so a crash never leaves it half written
+    const manifestPath = join(this.reportFolder, RUN_MANIFEST);
+    writeFileSync(`${manifestPath}.tmp`, JSON.stringify(this.manifest, null, 2));
+    renameSync(`${manifestPath}.tmp`, manifestPath);
+  }
 
-    const reportFileName = `${modeFolder}/${source.pageName.trim()}_${mode}_${viewportName}.html`;
-    writeFileSync(reportFileName, reportHtml);
-    console.log(`Saved report: ${reportFileName}`);
+  async runWithRetry(job: AuditJob, slot: number): Promise<boolean> {
+    for (let attempt = 0; attempt <= AUDIT_RETRIES; attempt++) {
+      console.log(`Auditing: ${job.source.url} | Mode: ${job.mode} | Viewport: ${JSON.stringify(job.viewport)} | Chrome: ${slot}`);
+      try {
+        // Checked before every attempt, so a session that expired mid-run is renewed here
+        const cookieHeader = await this.session.getCookieHeader();
+        const options = this.getBrowserConfig(job.viewport, this.chromePool[slot].port, cookieHeader);
+        await this.runAuditProcess({
+          url: job.source.url,
+          mode: job.mode,
+          reportName: this.getReportName(job),
+          options,
+          formats: REPORT_FORMATS,
+          trimJson: TRIM_JSON,
+        });
+        return true;
+      } catch (error) {
+        console.error(`Audit failed (attempt ${attempt + 1} of ${AUDIT_RETRIES + 1}): ${job.source.url}`, error);
+        if (attempt === AUDIT_RETRIES) {
+          break;
+        }
+        // The browser may have crashed, so retry on a fresh one
+        await this.restartChrome(slot);
+        await sleep(AUDIT_RETRY_DELAY_MS * 2 ** attempt);
+      }
+    }
+    return false;
+  }
+
+  // Lighthouse is not safe to run twice in one process, so every attempt gets a process of its own
+  runAuditProcess(request: AuditRequest): Promise<void> {
+    return new Promise((resolve, reject) => {
+      const child = spawn(process.execPath, [AUDIT_RUNNER], { stdio: ["pipe", "inherit", "inherit"] });
+      child.on("error", reject);
+      child.on("exit", (code, signal) => {
+        if (code === 0) {
+          resolve();
+        } else if (code === SESSION_EXPIRED_EXIT_CODE) {
+          this.session.invalidate();
+          reject(new Error(`Session expired while auditing ${request.url}`));
+        } else {
+          reject(new Error(`Audit process for ${request.url} exited with ${signal ?? `code ${code}`}`));
+        }
+      });
+      child.stdin.end(JSON.stringify(request));
+    });
   }
 
   async setup(): Promise<void> {
     this.makeDirectory(this.reportFolder);
-    this.chrome = await launch({ chromeFlags: [] });
-
-    // Launch Puppeteer for authentication
-    const puppeteerOptions = {
-      headless: false,
-      args: [`--remote-debugging-port=${this.chrome.port}`],
-    };
-    this.browser = await puppeteer.launch(puppeteerOptions);
 
-    // Authenticate and save cookies
-    const page = await this.browser.newPage();
-    await page.goto("https://erp.agnikul.in/login", { waitUntil: "networkidle2" });
+    // Reuse the saved session, or log in once, before starting any browser for the audits
+    await this.session.getSession();
 
-    await page.type("#login_email", ERP_USER);
-    await page.type("#login_password", ERP_PWD);
-    await page.click("#login-button");
-    await page.waitForNavigation({ waitUntil: "networkidle2", timeout: 0 });
+    // One Chrome per concurrent audit, each on its own port and fresh profile
+    this.chromePool = await Promise.all(
+      Array.from({ length: Math.max(1, AUDIT_CONCURRENCY) }, () => launch({ chromeFlags: [] }))
+    );
+    console.log(`Launched ${this.chromePool.length} Chrome instances on ports ${this.chromePool.map((chrome) => chrome.port).join(", ")}`);
+  }
 
-    const cookies = await page.cookies();
-    const cookieHeader = cookies.map((cookie) => `${cookie.name}=${cookie.value}`).join("; ");
-    writeFileSync(this.cookieFile, cookieHeader);
-    console.log("Authentication completed and cookies saved.");
+  async restartChrome(slot: number): Promise<void> {
+    try {
+      await this.chromePool[slot].kill();
+    } catch (error) {
+      console.error("Error stopping Chrome:", error);
+    }
+    this.chromePool[slot] = await launch({ chromeFlags: [] });
   }
 
-  async getUrls(): Promise<{ url: string; pageName: string }[]> {
-    return dataContent.APP_NAME;
+  async getUrls(): Promise<Source[]> {
+    // Read at run time so a crawl earlier in the same run is picked up
+    const siteMap = loadSiteMap();
+    if (!this.options.newPages) {
+      return siteMap.APP_NAME;
+    }
+    // New pages are those no run has fully audited yet, however many crawls found them since
+    const pages = siteMap.APP_NAME.filter((page) => !page.lastAudited);
+    console.log(`Auditing the ${pages.length} pages of ${SITEMAP_FILE} that were never audited`);
+    return pages;
   }
 
   makeDirectory(path: string): void {
@@ -114,22 +257,15 @@ export class LightHouseWrapper {
   }
 
   async teardown(): Promise<void> {
-    await this.browser.close();
-    await this.chrome.kill();
+    await Promise.all(this.chromePool.map((chrome) => chrome.kill()));
+    this.chromePool = [];
   }
 
-  async getBrowserConfig(viewport: { width: number; height: number }): Promise<any> {
-    let cookieHeader = "";
-    try {
-      cookieHeader = readFileSync(this.cookieFile, "utf-8");
-    } catch (err) {
-      console.error("Error reading cookie file:", err);
-    }
-
+  getBrowserConfig(viewport: Viewport, port: number, cookieHeader: string): any {
     return {
       logLevel: "info",
-      output: "html",
-      port: this.chrome.port,
+      output: REPORT_FORMATS.includes("html") ? "html" : "json",
+      port,
       extraHeaders: {
         Cookie: cookieHeader,
       },
@@ -142,7 +278,11 @@ export class LightHouseWrapper {
     };
   }
 
-  getViewports(): { width: number; height: number }[] {
+  getViewportName(viewport: Viewport): string {
+    return viewport.width < 768 ? "mobile" : viewport.width === 768 ? "tablet" : "desktop";
+  }
+
+  getViewports(): Viewport[] {
     return [
       { width: 1920, height: 1080 }, // Desktop
       { width: 768, height: 1024 }, // Tablet
@@ -151,10 +291,44 @@ export class LightHouseWrapper {
   }
 }
 
+function parseCommandLine(): AuditOptions {
+  const { values } = parseArgs({
+    args: process.argv.slice(2),
+    options: {
+      resume: { type: "string" },
+      pages: { type: "string" },
+      modes: { type: "string" },
+      viewports: { type: "string" },
+      crawl: { type: "boolean" },
+      "new-pages": { type: "boolean" },
+    },
+  });
+  const list = (value?: string) => value?.split(",").map((item) => item.trim()).filter(Boolean);
+
+  const modes = list(values.modes);
+  const unknownMode = modes?.find((mode) => !MODES.includes(mode as Mode));
+  if (unknownMode) {
+    throw new Error(`Unknown mode "${unknownMode}", expected one of ${MODES.join(", ")}`);
+  }
+  // A misspelt format would save no report at all, yet the audit would be recorded as done
+  const unknownFormat = REPORT_FORMATS.find((format) => !FORMATS.includes(format));
+  if (unknownFormat !== undefined) {
+    throw new Error(`Unknown REPORT_FORMATS value "${unknownFormat}", expected one of ${FORMATS.join(", ")}`);
+  }
+  return {
+    resume: values.resume,
+    pages: list(values.pages),
+    modes: modes as Mode[] | undefined,
+    viewports: list(values.viewports),
+    crawl: values.crawl,
+    newPages: values["new-pages"],
+  };
+}
+
 // Invoke the function
 (async () => {
   try {
-    const lightHouseWrapper = new LightHouseWrapper();
+    const lightHouseWrapper = new LightHouseWrapper(parseCommandLine());
     await lightHouseWrapper.auditSite();
     console.log("Audit completed successfully.");
   } catch (error) {
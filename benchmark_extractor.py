@@ -0,0 +1,532 @@
+# Offline benchmark of the extraction pipeline on a synthetic report corpus.
+# Needs the same packages as the extractor, but no browser, network or Tesseract
+# (Tesseract is only benchmarked when its binary is installed).
+import argparse
+from collections import Counter
+import contextlib
+import gzip
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import lighthouse_metrics_extractor as extractor
+
+CATEGORIES = ['Fleet_Management', 'Quality_Desk', 'Stores', 'Finance', 'HR']
+MODES = ['navigation', 'snapshot', 'timespan']
+DEVICES = ['desktop', 'tablet', 'mobile']
+STAGES = ['lhr', 'ocr', 'merge', 'tabulate', 'plots']
+
+# Gauge drawing of render_gauge_screenshot, sized to what locate_gauge_crops searches for
+GAUGE_RADIUS = 40
+GAUGE_SPACING = 160
+
+def synthetic_scores(rng):
+    """Four 0-100 scores in gauge order."""
+    return [rng.randint(0, 100) for _ in extractor.METRIC_LABELS]
+
+def synthetic_lhr(rng, scores, fetch_time, padding_kb=0):
+    """
+    Build a Lighthouse result holding the given scores and random timings.
+
+    :param padding_kb: Size of a filler screenshot audit, to mimic the bulk of a real report
+    """
+    audits = {
+        audit_id: {"id": audit_id, "numericValue": rng.uniform(0, 0.5) if column == 'cls' else rng.uniform(100, 8000)}
+        for column, audit_id in extractor.TIMING_AUDITS.items()
+    }
+    audits['mainthread-work-breakdown']['details'] = {"type": "table", "items": [
+        {"group": group, "duration": rng.uniform(10, 2000)} for group in extractor.MAINTHREAD_COLUMNS
+    ]}
+    for audit_id in ('render-blocking-resources', 'unused-javascript', 'unused-css-rules', 'uses-long-cache-ttl'):
+        audits[audit_id] = {"id": audit_id, "title": audit_id, "details": {
+            "type": "opportunity", "overallSavingsMs": rng.uniform(0, 3000), "overallSavingsBytes": rng.uniform(0, 5e5),
+        }}
+    audits['final-screenshot'] = {"id": "final-screenshot", "details": {"data": "A" * (padding_kb * 1024)}}
+    return {
+        "fetchTime": fetch_time,
+        "categories": {
+            category_id: {"id": category_id, "score": score / 100}
+            for category_id, score in zip(
+                (extractor.LHR_CATEGORY_IDS[label] for label in extractor.METRIC_LABELS), scores
+            )
+        },
+        "audits": audits,
+    }
+
+def report_layout(reports, runs):
+    """
+    Spread a number of reports over runs, categories, pages, modes and devices.
+
+    :return: List of (run timestamp, category, page, mode, device), at most `reports` long
+    """
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    per_run = math.ceil(reports / runs)
+    pages = math.ceil(per_run / (len(MODES) * len(DEVICES)))
+    layout = []
+    for run in range(runs):
+        run_timestamp = (start + timedelta(days=run)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        for page in range(pages):
+            for mode in MODES:
+                for device in DEVICES:
+                    layout.append((run_timestamp, CATEGORIES[page % len(CATEGORIES)], f'page{page}', mode, device))
+    return layout[:reports]
+
+def generate_metrics_tree(root, reports, runs=1, seed=0):
+    """
+    Write per-report JSON files like the extractor does, under Metrics/<run>/<category>/<page>/<mode>_mode/.
+
+    :return: Dict of (category, page, mode_mode, device, run timestamp) to the written scores
+    """
+    rng = random.Random(seed)
+    truth = {}
+    for run_timestamp, category, page, mode, device in report_layout(reports, runs):
+        folder = os.path.join(root, run_timestamp.replace(':', '-'), category, page, f'{mode}_mode')
+        os.makedirs(folder, exist_ok=True)
+        scores = synthetic_scores(rng)
+        lhr = synthetic_lhr(rng, scores, run_timestamp)
+        with open(os.path.join(folder, f'{page}_{mode}_{device}.json'), 'w') as json_file:
+            json.dump({
+                "extracted_numbers": scores,
+                "fetch_time": run_timestamp,
+                "timings": extractor.extract_timings_from_lhr(lhr),
+                "opportunities": extractor.extract_opportunities_from_lhr(lhr),
+                "source": "lhr",
+            }, json_file)
+        truth[(category, page, f'{mode}_mode', device, run_timestamp)] = scores
+    return truth
+
+def generate_lhr_reports(root, reports, padding_kb=256, seed=0):
+    """
+    Write HTML reports embedding a Lighthouse result, and the same result as .json.gz.
+
+    :return: List of (html path, json.gz path, scores)
+    """
+    rng = random.Random(seed)
+    renderer = '<script>' + 'var lighthouseRenderer = 0;\n' * 4096 + '</script>'
+    generated = []
+    for run_timestamp, category, page, mode, device in report_layout(reports, 1):
+        folder = os.path.join(root, category, page, f'{mode}_mode')
+        os.makedirs(folder, exist_ok=True)
+        scores = synthetic_scores(rng)
+        lhr = json.dumps(synthetic_lhr(rng, scores, run_timestamp, padding_kb)).replace('<', '\\u003c')
+        html_path = os.path.join(folder, f'{page}_{mode}_{device}.html')
+        with open(html_path, 'w') as html_file:
+            html_file.write(f'<html><head>{renderer}</head><body>'
+                            f'<script>window.__LIGHTHOUSE_JSON__ = {lhr};</script></body></html>')
+        json_path = os.path.join(folder, f'{page}_{mode}_{device}.json.gz')
+        with gzip.open(json_path, 'wt') as json_file:
+            json_file.write(lhr)
+        generated.append((html_path, json_path, scores))
+    return generated
+
+def gauge_font(size, font_path=None):
+    """
+    Font for the gauge digits: the given TTF, e.g. Roboto as in real reports, or PIL's bundled sans.
+
+    Neither is the Hershey font render_glyph_templates draws, so no engine is scored on its own glyphs.
+    """
+    from PIL import ImageFont
+
+    if font_path:
+        return ImageFont.truetype(font_path, size)
+    return ImageFont.load_default(size=size)
+
+def gauge_centres(image, gauges):
+    """Centre of each gauge drawn by render_gauge_screenshot, left to right."""
+    return [(GAUGE_SPACING * (index + 1), image.shape[0] // 2) for index in range(gauges)]
+
+def render_gauge_screenshot(scores, seed=0, font_path=None):
+    """
+    Draw a report-like strip of score gauges: a coloured ring with the score in its centre.
+
+    :param font_path: TrueType font of the scores, PIL's bundled sans when not given
+    :return: A BGR image, as decoded from a Selenium screenshot
+    """
+    import cv2
+    import numpy as np
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    width = GAUGE_SPACING * (len(scores) + 1)
+    image = np.full((3 * GAUGE_RADIUS + 60, width, 3), 255, dtype=np.uint8)
+    texts = []
+    for centre, score in zip(gauge_centres(image, len(scores)), scores):
+        colour = (60, 60, 220) if score < 50 else (0, 160, 250) if score < 90 else (80, 180, 60)
+        cv2.circle(image, centre, GAUGE_RADIUS, (235, 235, 235), 6)
+        # Lighthouse draws the arc proportional to the score, starting at the top
+        cv2.ellipse(image, centre, (GAUGE_RADIUS, GAUGE_RADIUS), -90, 0, 360 * score / 100, colour, 6)
+        texts.append((centre, str(score), colour))
+
+    # PIL writes the colour tuples as given, so they stay in BGR order like the rings
+    canvas = Image.fromarray(image)
+    draw = ImageDraw.Draw(canvas)
+    for centre, text, colour in texts:
+        size = round(30 * (1 + rng.uniform(-0.05, 0.05)))
+        draw.text(centre, text, fill=colour, font=gauge_font(size, font_path), anchor='mm')
+    return np.array(canvas)
+
+def gauge_crops(image, gauges):
+    """Thresholded crops at the known gauge positions, as the extractor cuts them from the DOM geometry."""
+    crops = []
+    for x, y in gauge_centres(image, gauges):
+        crops.append(extractor.threshold_gauge(
+            image[y - GAUGE_RADIUS:y + GAUGE_RADIUS, x - GAUGE_RADIUS:x + GAUGE_RADIUS]
+        ))
+    return crops
+
+class NoTesseract:
+    """
+    Takes the place of the tesserocr engine when Tesseract is not installed.
+
+    Gauges the templates are unsure of read as nothing, so they count as misses
+    instead of stopping the benchmark; reads counts how many there were.
+    """
+
+    def __init__(self):
+        self.reads = 0
+
+    def SetImage(self, image):
+        self.reads += 1
+
+    def GetUTF8Text(self):
+        return ''
+
+def measure(call, items, memory=True):
+    """
+    Time call(item) for every item, then run the first item again under tracemalloc.
+
+    The memory pass is separate so tracemalloc does not slow down the timings.
+    Output printed by the pipeline is swallowed.
+
+    :return: Dict with the total time, throughput, latency percentiles, peak
+        traced memory and the list of results
+    """
+    latencies, results = [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        for item in items:
+            call_started = time.perf_counter()
+            results.append(call(item))
+            latencies.append(time.perf_counter() - call_started)
+        total = time.perf_counter() - started
+
+        peak = None
+        if memory and items:
+            tracemalloc.start()
+            call(items[0])
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return {
+        "calls": len(items),
+        "total_s": round(total, 4),
+        "throughput_per_s": round(len(items) / total, 2) if total else None,
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p90_ms": round(cuts[89] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "peak_mb": None if peak is None else round(peak / 2 ** 20, 2),
+        "results": results,
+    }
+
+def frame_digest(frame):
+    """Hash a table's values, so a change of any score shows up between runs."""
+    return hashlib.sha256(frame.to_csv(index=False).encode()).hexdigest()[:16]
+
+def bench_lhr(workdir, args):
+    """Read scores from HTML reports and from .json.gz results."""
+    generated = generate_lhr_reports(os.path.join(workdir, 'Reports'), args.lhr_reports, args.padding_kb, args.seed)
+    output_dir = os.path.join(workdir, 'LhrMetrics')
+    os.makedirs(output_dir, exist_ok=True)
+
+    results = {}
+    for name, index in (('html', 0), ('json_gz', 1)):
+        stats = measure(
+            lambda report: extractor.extract_report(report[index], output_dir)['extracted_numbers'],
+            generated, args.memory,
+        )
+        correct = sum(numbers == scores for numbers, (_, _, scores) in zip(stats.pop('results'), generated))
+        stats["accuracy"] = correct / len(generated)
+        results[f'lhr_{name}'] = stats
+    return results
+
+def bench_ocr(workdir, args):
+    """
+    Read synthetic gauge screenshots through recognize_gauges with every OCR engine.
+
+    - tesseract: Tesseract alone, when its binary is installed
+    - template: the glyph set given with --glyphs, when it exists
+    - template_calibrated: a glyph set calibrated from the first half of the
+      screenshots, the way the calibrate command does from reports, read on the other half
+
+    Without Tesseract the template engines still run, and the gauges they would
+    hand to Tesseract count as misses.
+    """
+    rng = random.Random(args.seed)
+    screenshots = []
+    for index in range(args.ocr_images):
+        scores = synthetic_scores(rng)
+        screenshots.append((render_gauge_screenshot(scores, args.seed + index, args.font), scores))
+    calibration, held_out = screenshots[:len(screenshots) // 2], screenshots[len(screenshots) // 2:]
+
+    tesseract = shutil.which('tesseract') is not None
+    if not tesseract:
+        print("Tesseract not installed, skipping the tesseract engine; gauges the templates are unsure of count as misses")
+
+    results = {}
+    engines = {}
+    if tesseract:
+        engines['tesseract'] = (dict(ocr_engine='tesseract'), screenshots)
+    else:
+        results['ocr_tesseract'] = {"skipped": "Tesseract not installed"}
+    if args.glyphs and os.path.exists(args.glyphs):
+        engines['template'] = (dict(ocr_engine='template', template_path=args.glyphs), screenshots)
+    else:
+        results['ocr_template'] = {"skipped": f"no glyph set at {args.glyphs}"}
+
+    calibrated_path = os.path.join(workdir, 'glyphs', 'calibrated_digits.npz')
+    calibration_crops = [crop for image, scores in calibration for crop in gauge_crops(image, len(scores))]
+    calibration_scores = [score for _, scores in calibration for score in scores]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            extractor.save_glyph_templates(calibration_crops, calibration_scores, calibrated_path)
+        engines['template_calibrated'] = (dict(ocr_engine='template', template_path=calibrated_path), held_out)
+    except ValueError as error:
+        results['ocr_template_calibrated'] = {"skipped": str(error)}
+
+    for engine, (options, images) in engines.items():
+        tess_api = None if tesseract else NoTesseract()
+        crops = []
+        def read(index):
+            image_crops = extractor.locate_gauge_crops(images[index][0])
+            crops.append(len(image_crops))
+            return extractor.recognize_gauges(image_crops, tess_api=tess_api, **options)
+        stats = measure(read, list(range(len(images))), args.memory)
+
+        # Hough circles come back in no particular order, so compare the sets of scores
+        numbers = stats.pop('results')
+        gauges = sum(len(scores) for _, scores in images)
+        correct = sum(
+            sum((Counter(read_numbers) & Counter(scores)).values())
+            for read_numbers, (_, scores) in zip(numbers, images)
+        )
+        stats["gauges_found"] = sum(crops[:len(images)])
+        stats["gauges"] = gauges
+        stats["accuracy"] = correct / gauges
+        if tess_api is not None:
+            stats["unread_without_tesseract"] = tess_api.reads
+        results[f'ocr_{engine}'] = stats
+    return results
+
+def bench_merge(workdir, args):
+    """Merge a nested metrics tree: a full rebuild, an unchanged rerun and a rerun with 1% of files touched."""
+    import pandas as pd
+
+    metrics_dir = os.path.join(workdir, 'Metrics')
+    with contextlib.redirect_stdout(io.StringIO()):
+        truth = generate_metrics_tree(metrics_dir, args.reports, args.runs, args.seed)
+    files = sorted(relative_path for relative_path, _, _ in extractor.scan_metric_files(metrics_dir))
+
+    results = {}
+    repeats = [None] * args.repeat
+    stats = measure(lambda _: extractor.merge_json_files(metrics_dir, incremental=False), repeats, args.memory)
+    stats.pop('results')
+    stats["throughput_per_s"] = round(len(files) * args.repeat / stats['total_s'], 2)
+    results['merge_full'] = stats
+
+    stats = measure(lambda _: extractor.merge_json_files(metrics_dir), repeats, args.memory)
+    stats.pop('results')
+    stats["throughput_per_s"] = round(len(files) * args.repeat / stats['total_s'], 2)
+    results['merge_unchanged'] = stats
+
+    touched = files[::100]
+    def touch_and_merge(_):
+        for relative_path in touched:
+            os.utime(os.path.join(metrics_dir, relative_path))
+        return extractor.merge_json_files(metrics_dir)
+    stats = measure(touch_and_merge, repeats, args.memory)
+    stats.pop('results')
+    stats["files_changed"] = len(touched)
+    stats["throughput_per_s"] = round(len(touched) * args.repeat / stats['total_s'], 2)
+    results['merge_touched'] = stats
+
+    # Every score in the store must be the one written to the tree
+    frame = extractor.load_metrics_frame(metrics_dir)
+    frame = frame.assign(run_timestamp=frame['run_timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S.000Z'))
+    key = ['category', 'page', 'mode', 'device', 'run_timestamp', 'metric']
+    stored = frame.set_index(key)['score']
+    expected = pd.Series({
+        key + (metric,): score
+        for key, scores in truth.items()
+        for metric, score in zip(extractor.METRIC_LABELS, scores)
+    })
+    stored = stored.reindex(expected.index)
+    results['merge_full']["accuracy"] = float((stored.to_numpy() == expected.to_numpy()).mean())
+    results['merge_full']["digest"] = frame_digest(frame.sort_values(key)[key + ['score']])
+    return results
+
+def bench_tabulate(workdir, args):
+    """Tabulate the merged store into parsed_data.xlsx, the per-mode percentages and the multi-sheet workbook."""
+    metrics_dir = os.path.join(workdir, 'Metrics')
+    frame = extractor.load_metrics_frame(metrics_dir)
+    excel_path = os.path.join(workdir, 'parsed_data.xlsx')
+    repeats = [None] * args.repeat
+
+    stats = measure(lambda _: extractor.parse_json_to_dataframe(metrics_dir, excel_path), repeats, args.memory)
+    stats["digest"] = frame_digest(stats.pop('results')[-1])
+    results = {'tabulate': stats}
+
+    stats = measure(
+        lambda _: extractor.calculate_metric_percentage(frame, os.path.join(workdir, 'metric.xlsx')), repeats, args.memory
+    )
+    stats.pop('results')
+    results['percentage'] = stats
+
+    workbook_path = os.path.join(workdir, 'metrics_report.xlsx')
+    stats = measure(lambda _: extractor.export_workbook(metrics_dir, workbook_path), repeats, args.memory)
+    stats.pop('results')
+    results['export'] = stats
+    return results
+
+def bench_plots(workdir, args):
+    """Render the page plots of the first pages and the summary plot, and build the HTML dashboard."""
+    frame = extractor.load_metrics_frame(os.path.join(workdir, 'Metrics'))
+    pages = frame['page'].cat.categories[:args.plot_pages]
+    frame = frame[frame['page'].isin(pages)]
+    render_options = dict(dpi=args.dpi, workers=args.plot_workers, incremental=False)
+    plots_dir = os.path.join(workdir, 'Plots')
+    repeats = [None] * args.repeat
+
+    stats = measure(lambda _: extractor.create_plots(frame, plots_dir, **render_options), repeats, args.memory)
+    stats.pop('results')
+    stats["figures"] = len(pages) * len(MODES)
+    stats["throughput_per_s"] = round(stats['figures'] * args.repeat / stats['total_s'], 2)
+    results = {'plots_pages': stats}
+
+    stats = measure(lambda _: extractor.create_summary_plot(frame, plots_dir, **render_options), repeats, args.memory)
+    stats.pop('results')
+    results['plots_summary'] = stats
+
+    # The dashboard covers every page, not just the first plot_pages
+    metrics_dir = os.path.join(workdir, 'Metrics')
+    dashboard_path = os.path.join(workdir, 'dashboard.html')
+    stats = measure(lambda _: extractor.build_dashboard(metrics_dir, dashboard_path), repeats, args.memory)
+    stats.pop('results')
+    stats["size_mb"] = round(os.path.getsize(dashboard_path) / 2 ** 20, 2)
+    results['dashboard'] = stats
+    return results
+
+STAGE_BENCHMARKS = {
+    'lhr': bench_lhr,
+    'ocr': bench_ocr,
+    'merge': bench_merge,
+    'tabulate': bench_tabulate,
+    'plots': bench_plots,
+}
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    List what got slower, lost accuracy or changed scores compared to a previous run.
+
+    :param tolerance: Allowed relative slowdown of the median latency, e.g. 0.2 for 20%
+    :return: List of human readable regressions
+    """
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if previous is None or 'skipped' in stats:
+            continue
+        if previous.get('p50_ms') and stats['p50_ms'] > previous['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {previous['p50_ms']} ms -> {stats['p50_ms']} ms")
+        if stats.get('accuracy') is not None and stats['accuracy'] < previous.get('accuracy', 0):
+            regressions.append(f"{name}: accuracy {previous['accuracy']:.3f} -> {stats['accuracy']:.3f}")
+        if previous.get('digest') and stats.get('digest') != previous['digest']:
+            regressions.append(f"{name}: scores changed (digest {previous['digest']} -> {stats.get('digest')})")
+    return regressions
+
+def build_parser():
+    """Build the benchmark command line; the defaults take about a minute"""
+    parser = argparse.ArgumentParser(description="Benchmark the extraction pipeline on a synthetic corpus")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"Comma separated stages to run, any of {', '.join(STAGES)}")
+    parser.add_argument('--reports', type=int, default=1000,
+                        help="Per-report JSON files in the metrics tree, e.g. 10 to 100000")
+    parser.add_argument('--runs', type=int, default=3, help="Runs the metrics tree is spread over")
+    parser.add_argument('--lhr-reports', type=int, default=50, help="HTML and .json.gz reports to extract")
+    parser.add_argument('--padding-kb', type=int, default=256, help="Filler data in each synthetic report")
+    parser.add_argument('--ocr-images', type=int, default=50, help="Synthetic gauge screenshots to read")
+    parser.add_argument('--font', default=None,
+                        help="TrueType font of the gauge scores, e.g. a Roboto TTF; PIL's bundled sans by default")
+    parser.add_argument('--glyphs', default=extractor.GLYPH_TEMPLATE_PATH,
+                        help="Calibrated glyph set the template engine is measured with")
+    parser.add_argument('--plot-pages', type=int, default=10, help="Pages whose plots are rendered")
+    parser.add_argument('--plot-workers', type=int, default=None)
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Repetitions of the stages that process the whole corpus in one call")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help="Skip the tracemalloc pass that measures peak memory")
+    parser.add_argument('--workdir', default=None, help="Keep the corpus and outputs here instead of a temp dir")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', default=None, help="Results of a previous run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed median slowdown against the baseline")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGE_BENCHMARKS]
+    if unknown:
+        raise SystemExit(f"Unknown stages: {', '.join(unknown)}")
+    # Tabulating and plotting read the merged store
+    if {'tabulate', 'plots'} & set(stages) and 'merge' not in stages:
+        stages.insert(0, 'merge')
+    stages.sort(key=STAGES.index)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='lighthouse_benchmark_')
+    os.makedirs(workdir, exist_ok=True)
+    results = {}
+    try:
+        for stage in stages:
+            print(f"Benchmarking {stage}...")
+            results.update(STAGE_BENCHMARKS[stage](workdir, args))
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    columns = ['calls', 'total_s', 'throughput_per_s', 'p50_ms', 'p90_ms', 'p99_ms', 'peak_mb', 'accuracy']
+    print(f"\n{'stage':<18}" + ''.join(f"{column:>18}" for column in columns))
+    for name, stats in results.items():
+        if 'skipped' in stats:
+            print(f"{name:<18}  skipped: {stats['skipped']}")
+            continue
+        print(f"{name:<18}" + ''.join(
+            f"{'' if stats.get(column) is None else stats[column]:>18}" for column in columns
+        ))
+
+    with open(args.output, 'w') as output_file:
+        json.dump({"config": vars(args), "results": results}, output_file, indent=4)
+    print(f"\nResults saved to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare_with_baseline(results, json.load(baseline_file)['results'], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+if __name__ == '__main__':
+    main()
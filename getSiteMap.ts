@@ -1,104 +1,256 @@
+// The stealth plugin is registered on puppeteerExtra by ./session
 import puppeteerExtra from "puppeteer-extra";
-import puppeteerExtraPluginStealth from "puppeteer-extra-plugin-stealth";
-import { writeFileSync } from "fs";
+import type { Browser } from "puppeteer";
+import { ERP_URL, SessionManager } from "./session";
+import { writeFileSync, readFileSync, existsSync, mkdirSync, renameSync } from "fs";
+import { dirname } from "path";
+import { parseArgs } from "util";
 
-puppeteerExtra.use(puppeteerExtraPluginStealth());
 import dotenv from "dotenv";
 dotenv.config();
 
-const ERP_USER = process.env.ERP_EMAIL;
-const ERP_PWD = process.env.ERP_PWD;
-const PageName: string = "Fleet_Management";
+// ERP modules to crawl, as they appear in the URL after the host
+const SITEMAP_MODULES = (process.env.SITEMAP_MODULES ?? "Fleet_Management").split(",").map((module) => module.trim()).filter(Boolean);
+// Modules crawled at once, each in its own tab of one browser sharing the session
+const SITEMAP_CONCURRENCY = Number(process.env.SITEMAP_CONCURRENCY ?? 4);
+// How long a module may take to load and render its menu
+const SITEMAP_TIMEOUT_MS = Number(process.env.SITEMAP_TIMEOUT_MS ?? 300000);
+const SITEMAP_HEADED = (process.env.SITEMAP_HEADED ?? "false") === "true";
 
-const generateSiteMap = async () => {
-  const browser = await puppeteerExtra.launch({ headless: false });
-  const page = await browser.newPage();
+export const SITEMAP_FILE = "siteMap/data.json";
 
-  await page.goto("https://erp.agnikul.in/login", {
-    waitUntil: "networkidle2",
-  });
+// Pages keep the keys the audit reads, when the crawler first and last found them and when
+// every audit of the page last completed
+export type SiteMapPage = {
+  pageName: string;
+  url: string;
+  module?: string;
+  firstSeen?: string;
+  lastSeen?: string;
+  lastAudited?: string;
+};
+export type SiteMap = {
+  APP_NAME: SiteMapPage[];
+  lastCrawl?: { startedAt: string; finishedAt: string; modules: string[]; failed: string[]; added: string[] };
+};
 
-  await page.type("#login_email", ERP_USER);
-  await page.type("#login_password", ERP_PWD);
+export const loadSiteMap = (): SiteMap => {
+  if (!existsSync(SITEMAP_FILE)) {
+    return { APP_NAME: [] };
+  }
+  return JSON.parse(readFileSync(SITEMAP_FILE, "utf-8"));
+};
 
-  await page.waitForFunction(
-    'document.querySelector("#login-button").disabled === false',
-    { timeout: 0 }
-  );
+const saveSiteMap = (siteMap: SiteMap): void => {
+  // Replace the sitemap atomically so an interrupted crawl never leaves it half written
+  mkdirSync(dirname(SITEMAP_FILE), { recursive: true });
+  writeFileSync(`${SITEMAP_FILE}.tmp`, JSON.stringify(siteMap, null, 2));
+  renameSync(`${SITEMAP_FILE}.tmp`, SITEMAP_FILE);
+};
 
-  await page.click("#login-button");
+// One spelling per page: no fragment and no trailing slash
+export const normalizeUrl = (link: string): string => {
+  try {
+    const url = new URL(link);
+    url.hash = "";
+    return url.href.replace(/\/+$/, "");
+  } catch {
+    return link;
+  }
+};
 
-  await page.waitForNavigation({ waitUntil: "networkidle2" });
+// Keep links to pages of the module on the ERP itself
+const normalizeLink = (link: string, module: string): string | null => {
+  try {
+    const url = new URL(link);
+    if (url.origin !== ERP_URL || !url.pathname.startsWith(`/${module}/`)) {
+      return null;
+    }
+    return normalizeUrl(link);
+  } catch {
+    return null;
+  }
+};
 
-  await page.goto("https://erp.agnikul.in/" + PageName, {
-    waitUntil: "networkidle2",
-  });
+// Record that every audit of a page completed, so --new-pages stops selecting it
+export const markAudited = (url: string, at: string = new Date().toISOString()): void => {
+  const siteMap = loadSiteMap();
+  const page = siteMap.APP_NAME.find((page) => normalizeUrl(page.url) === normalizeUrl(url));
+  if (page) {
+    page.lastAudited = at;
+    saveSiteMap(siteMap);
+  }
+};
+
+// Page names become report folders, so a name another module already uses gets the module as prefix
+const uniquePageName = (url: string, module: string, used: Set<string>): string => {
+  const name = new URL(url).pathname.split("/").filter(Boolean).pop() ?? module;
+  let pageName = used.has(name) ? `${module}_${name}` : name;
+  for (let index = 2; used.has(pageName); index++) {
+    pageName = `${module}_${name}_${index}`;
+  }
+  used.add(pageName);
+  return pageName;
+};
+
+const crawlModule = async (browser: Browser, module: string, session: SessionManager): Promise<string[]> => {
+  const page = await browser.newPage();
+  try {
+    await page.setCookie(...(await session.getCookies()));
+    await page.goto(`${ERP_URL}/${module}`, {
+      waitUntil: "networkidle2",
+      timeout: SITEMAP_TIMEOUT_MS,
+    });
+    if (new URL(page.url()).pathname.startsWith("/login")) {
+      // The next module logs in again instead of failing the same way
+      session.invalidate();
+      throw new Error("Session expired, redirected to the login page");
+    }
 
-  await page.waitForSelector(".preloader", { hidden: true, timeout: 300000 });
+    await page.waitForSelector(".preloader", { hidden: true, timeout: SITEMAP_TIMEOUT_MS });
 
-  
+    if (module === "food") {
+      await page.waitForSelector("#Get_started", { visible: true });
+      await page.click("#Get_started");
+      await page.waitForSelector("#request_food", { visible: true });
+    } else {
+      await page.waitForSelector(".menuicons", {
+        visible: true,
+        timeout: SITEMAP_TIMEOUT_MS,
+      });
+    }
 
-  if (PageName === "food") {
-    await page.waitForSelector("#Get_started", { visible: true });
-    await page.click("#Get_started");
-    await page.waitForSelector("#request_food", { visible: true });
-  }
+    if (module === "quality_desk") {
+      await page.waitForSelector(".menu");
 
-  if (PageName !== "food") {
-    await page.waitForSelector(".menuicons", {
-      visible: true,
-      timeout: 300000,
-    });  
-  }
+      // Open every dropdown first, then wait once for all their links to load
+      const dropdownMenus = await page.$$(".menu > div");
+      for (const dropdown of dropdownMenus) {
+        try {
+          // Check if the dropdown contains a menu icon and menu name
+          const menuName = await dropdown.$eval(
+            ".menuName",
+            (el) => (el as HTMLElement).innerText
+          );
 
-  if (PageName === "quality_desk") {
-    await page.waitForSelector(".menu");
-
-    // Click all dropdown menus dynamically
-    const dropdownMenus = await page.$$(".menu > div");
-
-    for (const dropdown of dropdownMenus) {
-      try {
-        // Check if the dropdown contains a menu icon and menu name
-        const menuName = await dropdown.$eval(
-          ".menuName",
-          (el) => el.innerText
-        );
-
-        console.log(`Opening dropdown: ${menuName}`);
-        await dropdown.click();
-        await page.waitForNetworkIdle();
-      } catch (error) {
-        console.log("Error interacting with dropdown:", error);
+          console.log(`Opening dropdown: ${menuName}`);
+          await dropdown.click();
+        } catch (error) {
+          console.log("Error interacting with dropdown:", error);
+        }
       }
+      await page.waitForNetworkIdle({ idleTime: 500, timeout: SITEMAP_TIMEOUT_MS });
     }
-  }
-  const links = await page.evaluate(() => {
-    return Array.from(document.querySelectorAll("a"))
-      .map((a) => a.href)
-      .filter(Boolean);
-  });
 
-  console.log(links);
+    return await page.evaluate(() => {
+      return Array.from(document.querySelectorAll("a"))
+        .map((a) => a.href)
+        .filter(Boolean);
+    });
+  } finally {
+    await page.close();
+  }
+};
 
-  const uniqueLinks = [...new Set(links)].filter((link) =>
-    link.includes("/" + PageName)
-  );
+/**
+ * Crawl the given ERP modules with one shared session and merge the pages found into the sitemap.
+ *
+ * Modules are crawled in parallel tabs, SITEMAP_CONCURRENCY at a time. Pages already in the
+ * sitemap keep their name and only get a new lastSeen; new pages are appended with a firstSeen
+ * and listed in lastCrawl.added. Pages that were not found again are kept, with their old
+ * lastSeen. The audit sets lastAudited, so pages never audited since they were found can be
+ * selected with --new-pages.
+ */
+const generateSiteMap = async (
+  modules: string[] = SITEMAP_MODULES,
+  session: SessionManager = new SessionManager()
+): Promise<SiteMap> => {
+  const startedAt = new Date().toISOString();
+  const found = new Map<string, string>();
+  const failed: string[] = [];
 
-  const jsonStructure = {
-    APP_NAME: uniqueLinks.map((link, index) => ({
-      pageName: link.split("/").pop(),
-      url: link,
-    })),
-  };
+  // Log in, or reuse the saved session, before opening any tab
+  await session.getSession();
+  const browser = await puppeteerExtra.launch({ headless: !SITEMAP_HEADED });
+  try {
+    let next = 0;
+    const workers = Math.min(Math.max(1, SITEMAP_CONCURRENCY), modules.length);
+    await Promise.all(
+      Array.from({ length: workers }, async () => {
+        while (next < modules.length) {
+          const module = modules[next++];
+          try {
+            const links = await crawlModule(browser, module, session);
+            let pages = 0;
+            for (const link of links) {
+              const url = normalizeLink(link, module);
+              if (url && !found.has(url)) {
+                found.set(url, module);
+                pages++;
+              }
+            }
+            console.log(`Crawled ${module}: ${pages} pages`);
+          } catch (error) {
+            console.error(`Error crawling ${module}:`, error);
+            failed.push(module);
+          }
+        }
+      })
+    );
+  } finally {
+    await browser.close();
+  }
 
-  writeFileSync("siteMap/data.json", JSON.stringify(jsonStructure, null, 2));
-  console.log("Sitemap generated and saved as sitemap.xml");
-  // const pageContent = await page.content();
-  // writeFileSync("siteMap/page.html", pageContent);
-  // console.log("Page content saved as page.html");
+  const siteMap = loadSiteMap();
+  // Entries saved before URLs were normalized may end in a slash or a fragment; spell them the
+  // way found links are, and keep only the first entry of a page listed twice
+  const byUrl = new Map<string, SiteMapPage>();
+  for (const page of siteMap.APP_NAME) {
+    page.url = normalizeUrl(page.url);
+    if (!byUrl.has(page.url)) {
+      byUrl.set(page.url, page);
+    }
+  }
+  siteMap.APP_NAME = [...byUrl.values()];
+  const used = new Set(siteMap.APP_NAME.map((page) => page.pageName.trim()));
+  const added: string[] = [];
+  for (const [url, module] of found) {
+    const existing = byUrl.get(url);
+    if (existing) {
+      existing.module ??= module;
+      existing.lastSeen = startedAt;
+      continue;
+    }
+    siteMap.APP_NAME.push({
+      pageName: uniquePageName(url, module, used),
+      url,
+      module,
+      firstSeen: startedAt,
+      lastSeen: startedAt,
+    });
+    added.push(url);
+  }
 
-  await browser.close();
+  siteMap.lastCrawl = { startedAt, finishedAt: new Date().toISOString(), modules, failed, added };
+  saveSiteMap(siteMap);
+  console.log(`Sitemap saved to ${SITEMAP_FILE}: ${found.size} pages found, ${added.length} new, ${siteMap.APP_NAME.length} in total`);
+  if (failed.length > 0) {
+    console.error(`Modules that could not be crawled: ${failed.join(", ")}`);
+  }
+  return siteMap;
 };
 
 export default generateSiteMap;
+
+if (import.meta.main) {
+  const { values } = parseArgs({
+    args: process.argv.slice(2),
+    options: { modules: { type: "string" } },
+  });
+  const modules = values.modules?.split(",").map((module) => module.trim()).filter(Boolean);
+
+  generateSiteMap(modules?.length ? modules : SITEMAP_MODULES).catch((error) => {
+    console.error("Error generating sitemap:", error);
+    process.exitCode = 1;
+  });
+}
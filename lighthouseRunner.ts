@@ -0,0 +1,111 @@
+import { writeFileSync } from "fs";
+import { gzipSync } from "zlib";
+import lighthouse from "lighthouse";
+
+// Runs a single Lighthouse audit in its own process. Lighthouse keeps its log, timing and
+// performance marks in module-level state, so audits sharing a process would corrupt each other;
+// auditSite.ts starts one of these per attempt and sends it the audit on stdin.
+
+export type AuditRequest = {
+  url: string;
+  mode: "navigation" | "snapshot" | "timespan";
+  // Report path without extension, one file per format is written next to it
+  reportName: string;
+  // Lighthouse flags: Chrome port, screen emulation and the session cookie
+  options: any;
+  formats: string[];
+  trimJson: boolean;
+};
+
+// Exit code telling the parent the audit ended on the login page, so it logs in again
+export const SESSION_EXPIRED_EXIT_CODE = 3;
+
+class SessionExpiredError extends Error {}
+
+export const trimResult = (lhr: any): any => {
+  const audits: Record<string, any> = {};
+  for (const [id, audit] of Object.entries<any>(lhr.audits)) {
+    const details = audit.details ?? {};
+    audits[id] = {
+      id,
+      title: audit.title,
+      score: audit.score,
+      numericValue: audit.numericValue,
+      numericUnit: audit.numericUnit,
+      // Opportunities keep their estimated savings; the main-thread breakdown keeps its groups
+      details: details.type === "opportunity"
+        ? { type: details.type, overallSavingsMs: details.overallSavingsMs, overallSavingsBytes: details.overallSavingsBytes }
+        : id === "mainthread-work-breakdown"
+        ? { type: details.type, items: (details.items ?? []).map((item: any) => ({ group: item.group, duration: item.duration })) }
+        : undefined,
+    };
+  }
+
+  const categories: Record<string, any> = {};
+  for (const [id, category] of Object.entries<any>(lhr.categories)) {
+    categories[id] = { id, title: category.title, score: category.score };
+  }
+
+  return {
+    lighthouseVersion: lhr.lighthouseVersion,
+    requestedUrl: lhr.requestedUrl,
+    finalDisplayedUrl: lhr.finalDisplayedUrl,
+    fetchTime: lhr.fetchTime,
+    gatherMode: lhr.gatherMode,
+    runWarnings: lhr.runWarnings,
+    configSettings: { formFactor: lhr.configSettings?.formFactor, throttlingMethod: lhr.configSettings?.throttlingMethod },
+    categories,
+    audits,
+    timing: lhr.timing,
+  };
+};
+
+const runAudit = async ({ url, mode, reportName, options, formats, trimJson }: AuditRequest): Promise<void> => {
+  const config = {
+    extends: "lighthouse:default",
+    settings: { output: formats.includes("html") ? "html" : "json", formFactor: options.screenEmulation.mobile ? "mobile" : "desktop" },
+  };
+
+  // Adjust config settings based on the mode
+  if (mode === "snapshot") {
+    config.settings = { ...config.settings, onlyAudits: ["screenshot-thumbnails"] };
+  } else if (mode === "timespan") {
+    config.settings = { ...config.settings, throttlingMethod: "provided" };
+  }
+
+  const runnerResult = await lighthouse(url, { ...options, mode }, config);
+  if (!runnerResult) {
+    throw new Error(`Lighthouse returned no result for ${url}`);
+  }
+  // A rejected session ends on the login page; audit it again with a new one instead of saving that
+  if (new URL(runnerResult.lhr.finalDisplayedUrl).pathname.startsWith("/login")) {
+    throw new SessionExpiredError(`Session expired while auditing ${url}`);
+  }
+
+  if (formats.includes("json")) {
+    const lhr = trimJson ? trimResult(runnerResult.lhr) : runnerResult.lhr;
+    writeFileSync(`${reportName}.json.gz`, gzipSync(JSON.stringify(lhr)));
+    console.log(`Saved report: ${reportName}.json.gz`);
+  }
+  if (formats.includes("html")) {
+    writeFileSync(`${reportName}.html`, runnerResult.report);
+    console.log(`Saved report: ${reportName}.html`);
+  }
+};
+
+if (import.meta.main) {
+  (async () => {
+    // The request comes on stdin rather than argv, so the session cookie never shows up in ps
+    const chunks: Buffer[] = [];
+    for await (const chunk of process.stdin) {
+      chunks.push(chunk);
+    }
+    try {
+      await runAudit(JSON.parse(Buffer.concat(chunks).toString("utf-8")));
+      process.exit(0);
+    } catch (error) {
+      console.error(error);
+      process.exit(error instanceof SessionExpiredError ? SESSION_EXPIRED_EXIT_CODE : 1);
+    }
+  })();
+}
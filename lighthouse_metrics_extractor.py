@@ -1,18 +1,334 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
+# Third-party packages (selenium, OpenCV, Tesseract, pandas, matplotlib) are imported
+# inside the functions that need them, so each CLI command only loads what it uses
+import argparse
+import contextlib
+from datetime import datetime, timedelta, timezone
+import functools
+import gzip
 import os
+import hashlib
 import json
-import time
-from PIL import Image
-import pytesseract
-from webdriver_manager.chrome import ChromeDriverManager
+import queue
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import threading
 import re
-import cv2
-import numpy as np
-import matplotlib.pyplot as plt
-import pandas as pd
+import sqlite3
+import time
+
+# Gauge order used by every per-report JSON file and the tables built from them
+METRIC_LABELS = ['SEO', 'Best Practice', 'Accessibility', 'Performance']
+
+# Lighthouse category ids behind each gauge
+LHR_CATEGORY_IDS = {
+    'SEO': 'seo',
+    'Best Practice': 'best-practices',
+    'Accessibility': 'accessibility',
+    'Performance': 'performance',
+}
+
+# Gauge labels as rendered in the report header, mapped to METRIC_LABELS
+GAUGE_LABELS = {
+    'seo': 'SEO',
+    'best practices': 'Best Practice',
+    'accessibility': 'Accessibility',
+    'performance': 'Performance',
+}
+
+# Label and viewport box of each header gauge; the SVG wrapper holds the ring and the score on top of it
+GAUGE_GEOMETRY_SCRIPT = """
+return Array.from(document.querySelectorAll('.lh-scores-container .lh-gauge__wrapper')).map((wrapper) => {
+    const label = wrapper.querySelector('.lh-gauge__label');
+    const box = (wrapper.querySelector('.lh-gauge__svg-wrapper') || wrapper).getBoundingClientRect();
+    return {
+        label: label ? label.textContent : '',
+        rect: {x: box.left, y: box.top, width: box.width, height: box.height},
+    };
+});
+"""
+
+# Timing metrics read from the Lighthouse audits: output column -> audit id.
+# Times are in ms, byte weight in bytes and CLS is unitless.
+TIMING_AUDITS = {
+    'lcp_ms': 'largest-contentful-paint',
+    'fcp_ms': 'first-contentful-paint',
+    'tbt_ms': 'total-blocking-time',
+    'cls': 'cumulative-layout-shift',
+    'speed_index_ms': 'speed-index',
+    'tti_ms': 'interactive',
+    'total_byte_weight': 'total-byte-weight',
+    'mainthread_ms': 'mainthread-work-breakdown',
+}
+
+# Groups of the main-thread work breakdown -> output column
+MAINTHREAD_COLUMNS = {
+    'scriptEvaluation': 'mainthread_script_evaluation_ms',
+    'styleLayout': 'mainthread_style_layout_ms',
+    'paintCompositeRender': 'mainthread_paint_composite_render_ms',
+    'scriptParseCompile': 'mainthread_script_parse_compile_ms',
+    'parseHTML': 'mainthread_parse_html_ms',
+    'garbageCollection': 'mainthread_garbage_collection_ms',
+    'other': 'mainthread_other_ms',
+}
+
+# Number of opportunities with the largest estimated savings kept per report
+TOP_OPPORTUNITIES = 3
+
+TIMING_COLUMNS = list(TIMING_AUDITS) + list(MAINTHREAD_COLUMNS.values())
+OPPORTUNITY_COLUMNS = [
+    column
+    for rank in range(1, TOP_OPPORTUNITIES + 1)
+    for column in (f'opportunity_{rank}', f'opportunity_{rank}_savings_ms', f'opportunity_{rank}_savings_bytes')
+]
+
+# Lighthouse HTML reports embed the full result as `window.__LIGHTHOUSE_JSON__ = {...};</script>`
+LHR_JSON_MARKER = re.compile(r'window\.__LIGHTHOUSE_JSON__\s*=\s*')
+LHR_READ_CHUNK_SIZE = 1 << 20
+
+# The audit runner can also save the Lighthouse result as gzip JSON next to, or instead of, the HTML
+REPORT_SUFFIXES = ('.json.gz', '.html')
+
+# Seconds a report may take in the browser, from loading it until its gauges are cropped
+# (reading them is bounded by OCR_TIME_BUDGET), and how often a failed report is put back
+# on the queue before it is given up
+REPORT_TIME_BUDGET = 60
+REPORT_RETRIES = 2
+EXTRACTION_ERRORS = 'extraction_errors.json'
+
+# The report is ready once its score container is laid out and every gauge shows its number
+REPORT_READY_SCRIPT = """
+const container = document.querySelector('.lh-scores-container');
+if (document.readyState !== 'complete' || !container || !container.getClientRects().length) {
+    return false;
+}
+return Array.from(container.querySelectorAll('.lh-gauge__percentage'))
+    .every(value => value.textContent.trim() !== '');
+"""
+
+# Manifests that let reruns skip reports and metric files they have already processed.
+# The extraction manifest format is bumped whenever the per-report JSON gains fields,
+# so reports extracted by an older version are extracted again.
+EXTRACTION_MANIFEST = 'extraction_manifest.json'
+EXTRACTION_MANIFEST_VERSION = 2
+# Reports extracted between two saves of the extraction manifest, so an interrupted run keeps its progress
+EXTRACTION_MANIFEST_SAVE_INTERVAL = 50
+MERGE_MANIFEST = 'merge_manifest.json'
+
+# Long-format metrics table written by merge_json_files, one row per score
+METRICS_STORE = 'metrics.parquet'
+METRICS_KEY = ['category', 'page', 'mode', 'device']
+METRICS_COLUMNS = ['run_timestamp', 'run'] + METRICS_KEY + ['metric', 'score', 'source']
+
+# Wide table of timings with one row per report, written next to the metrics store
+TIMINGS_STORE = 'timings.parquet'
+
+# Streaming merge: files read per batch, threads hiding filesystem latency, and
+# the manifest format, bumped whenever the store schema changes
+MERGE_BATCH_SIZE = 512
+MERGE_READ_THREADS = 16
+MERGE_MANIFEST_VERSION = 5
+MERGE_ERRORS = 'merge_errors.json'
+
+# Indexed SQLite copy of every score across runs, kept up to date by merge_json_files
+HISTORY_STORE = 'history.sqlite'
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    run_timestamp TEXT,
+    category TEXT NOT NULL,
+    page TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    device TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    score REAL,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_series ON scores (category, page, mode, device, metric, run_timestamp);
+CREATE INDEX IF NOT EXISTS scores_run ON scores (run_timestamp);
+CREATE INDEX IF NOT EXISTS scores_source ON scores (source);
+"""
+
+# Per-report JSON files below the metrics directory:
+# [<run ISO timestamp>/][category/]page/[<mode>_mode/]<page>_<mode>_<device>.json
+METRIC_FILE_PATTERN = re.compile(
+    r'^(?P<prefix>(?:[^/]+/)*?)(?P<page>[^/]+)/(?:(?P<mode>[^/]+_mode)/)?'
+    r'(?:[^/]*_)?(?P<file_mode>[^_/]+)_(?P<device>[^_/.]+)\.json$'
+)
+RUN_FOLDER_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}T')
+RUN_FOLDER_TIME = re.compile(r'T(\d{2})-(\d{2})-(\d{2})')
+DEFAULT_CATEGORY = 'Uncategorised'
+
+# Multi-sheet export: default workbook name in the metrics directory, Excel's row limit
+# per sheet and the rows converted to Python values at a time
+EXPORT_WORKBOOK = 'metrics_report.xlsx'
+EXCEL_MAX_ROWS = 1048576
+EXPORT_CHUNK_ROWS = 10000
+
+# Self-contained HTML dashboard: the page template, the file it is written to in the
+# metrics directory by default, and the marker replaced by the embedded data
+DASHBOARD_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard_template.html')
+DASHBOARD_FILE = 'dashboard.html'
+DASHBOARD_DATA_MARKER = '/*__DASHBOARD_DATA__*/null'
+
+# Fingerprints of rendered figures, kept in the plot directory to skip unchanged ones
+PLOT_MANIFEST = 'plot_manifest.json'
+
+# Timers and counters of every command, written next to its output
+RUN_SUMMARY = 'run_summary.json'
+# Functions listed in the text dump of each stage profile
+PROFILE_TOP_FUNCTIONS = 40
+
+# JSON files in the metrics directory that are not per-report results
+NON_REPORT_JSON = {
+    'merged_data.json', EXTRACTION_MANIFEST, MERGE_MANIFEST, PLOT_MANIFEST, MERGE_ERRORS, EXTRACTION_ERRORS,
+    RUN_SUMMARY,
+}
+
+TESSERACT_DIGITS_CONFIG = '--psm 10 -c tessedit_char_whitelist=0123456789'
+
+# Batched OCR tiles gauges into a grid and reads it as sparse text in one Tesseract call
+TESSERACT_BATCH_CONFIG = '--psm 11 -c tessedit_char_whitelist=0123456789'
+GAUGE_TILE_COLUMNS = 8
+GAUGE_TILE_CELL_SIZE = 128
+# Gauges a worker collects across reports before reading them together, four rows of tiles
+OCR_BATCH_GAUGES = GAUGE_TILE_COLUMNS * 4
+# Seconds a Tesseract process may run before it is killed; its reports fail and go back to the queue
+OCR_TIME_BUDGET = 30
+
+# Template digit classifier: glyph size, match threshold below which Tesseract takes over,
+# and the glyph set calibrated from real reports with the calibrate command
+GLYPH_WIDTH = 16
+GLYPH_HEIGHT = 24
+GLYPH_MIN_CONFIDENCE = 0.8
+GLYPH_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'glyphs', 'lighthouse_digits.npz')
+
+# Stage timers and counters of the current run, shared by all worker threads
+_run_stats = {"stages": {}, "counters": {}}
+_run_stats_lock = threading.Lock()
+# Directory per-stage profiles are dumped to, set by enable_profiling, and the profiles collected so far
+_profiling = {"dir": None, "profiles": {}}
+# Depth of nested stages in each thread; only the outermost one is profiled
+_stage_depth = threading.local()
+
+def count(name, increment=1):
+    """Add to a run counter, e.g. reports processed or OCR calls."""
+    with _run_stats_lock:
+        _run_stats["counters"][name] = _run_stats["counters"].get(name, 0) + increment
+
+@contextlib.contextmanager
+def timed_stage(name):
+    """
+    Time a stage of the run for the run summary.
+
+    When profiling is enabled, the outermost stage of each thread also runs
+    under cProfile, and its peak traced memory is recorded. With several
+    worker threads the memory peaks overlap, so treat them as an upper bound.
+
+    :param name: Stage name, e.g. 'page_load' or 'merge'; repeated stages are summed
+    """
+    depth = getattr(_stage_depth, 'value', 0)
+    profiler = None
+    if _profiling["dir"] is not None and depth == 0:
+        import cProfile
+        import tracemalloc
+
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one cProfile at a time per process; time this stage only
+            profiler = None
+    _stage_depth.value = depth + 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        _stage_depth.value = depth
+        peak = None
+        if profiler is not None:
+            profiler.disable()
+            peak = tracemalloc.get_traced_memory()[1]
+        with _run_stats_lock:
+            stage = _run_stats["stages"].setdefault(name, {"calls": 0, "total_s": 0.0, "max_s": 0.0})
+            stage["calls"] += 1
+            stage["total_s"] += elapsed
+            stage["max_s"] = max(stage["max_s"], elapsed)
+            if profiler is not None:
+                stage["peak_mb"] = max(stage.get("peak_mb", 0.0), peak / 2 ** 20)
+                _profiling["profiles"].setdefault(name, []).append(profiler)
+
+def timed(name):
+    """Decorator running the whole function as one timed_stage."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timed_stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def enable_profiling(profile_dir):
+    """Profile the outermost stages with cProfile and trace memory allocations with tracemalloc."""
+    import tracemalloc
+
+    os.makedirs(profile_dir, exist_ok=True)
+    _profiling["dir"] = profile_dir
+    tracemalloc.start()
+
+def write_run_summary(summary_path, command, started_at, wall_s):
+    """
+    Write the stage timers and counters of this run as JSON, plus the profiles when profiling.
+
+    Each profiled stage gets <stage>.prof, loadable with pstats or snakeviz,
+    and <stage>.txt with its slowest functions; memory_top.txt lists the
+    lines holding the most memory at the end of the run.
+
+    :param summary_path: Where to write the run summary
+    :param command: CLI command that ran
+    :param started_at: UTC datetime the run started
+    :param wall_s: Wall time of the whole run in seconds
+    :return: The summary dict
+    """
+    with _run_stats_lock:
+        stages = {
+            name: {
+                "calls": stage["calls"],
+                "total_s": round(stage["total_s"], 4),
+                "mean_ms": round(stage["total_s"] / stage["calls"] * 1000, 3),
+                "max_ms": round(stage["max_s"] * 1000, 3),
+                **({"peak_mb": round(stage["peak_mb"], 2)} if "peak_mb" in stage else {}),
+            }
+            for name, stage in _run_stats["stages"].items()
+        }
+        summary = {
+            "command": command,
+            "started_at": started_at.isoformat(),
+            "wall_s": round(wall_s, 4),
+            "stages": stages,
+            "counters": dict(_run_stats["counters"]),
+        }
+
+    profile_dir = _profiling["dir"]
+    if profile_dir is not None:
+        import pstats
+        import tracemalloc
+
+        for name, profilers in _profiling["profiles"].items():
+            stats = pstats.Stats(*profilers)
+            stats.dump_stats(os.path.join(profile_dir, f"{name}.prof"))
+            with open(os.path.join(profile_dir, f"{name}.txt"), 'w') as profile_file:
+                stats.stream = profile_file
+                stats.sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+        with open(os.path.join(profile_dir, 'memory_top.txt'), 'w') as memory_file:
+            for statistic in tracemalloc.take_snapshot().statistics('lineno')[:PROFILE_TOP_FUNCTIONS]:
+                memory_file.write(f"{statistic}\n")
+        summary["profile_dir"] = profile_dir
+
+    os.makedirs(os.path.dirname(summary_path) or '.', exist_ok=True)
+    with open(summary_path, 'w') as summary_file:
+        json.dump(summary, summary_file, indent=4)
+    print(f"Run summary saved to: {summary_path}")
+    return summary
 
 def format_cell_value(value):
     """Format snake_case or camelCase to human-readable format."""
@@ -22,196 +338,952 @@ def format_cell_value(value):
     formatted_value = " ".join(word.capitalize() for word in value.split('_'))
     return formatted_value
 
-def parse_json_to_dataframe(json_path):
+def run_timestamps(runs, fetch_times):
     """
-    Parse the JSON file and convert it into a structured DataFrame.
-    
-    :param json_path: Path to the JSON file
-    :return: A pandas DataFrame
+    Timestamp of the run each report belongs to.
+
+    Every report of an audit run shares the name of its `Reports/<ISO date>`
+    folder; only reports outside a run folder fall back to their own fetch time.
+
+    :param runs: Run folder names, None where a report has none
+    :param fetch_times: Fetch times recorded by the extractor, in the same order
+    :return: A Series of UTC timestamps, NaT where neither can be parsed
+    """
+    import pandas as pd
+
+    def parse(values):
+        return pd.to_datetime(pd.Series(values, dtype=object), utc=True, errors='coerce', format='ISO8601')
+
+    # Folders may be saved with dashes in place of the colons of the time
+    runs = [None if run is None else RUN_FOLDER_TIME.sub(r'T\1:\2:\3', run) for run in runs]
+    return parse(runs).fillna(parse(list(fetch_times)))
+
+def build_metrics_frame(records):
+    """
+    Flatten merge records into the long-format metrics table.
+
+    The run is the `Reports/<ISO date>` folder of the report, None outside
+    one, and its timestamp comes from that folder, see run_timestamps.
+
+    :param records: Iterable of records returned by read_metric_file
+    :return: A DataFrame with METRICS_COLUMNS and categorical dimensions
     """
-    # Load the JSON data from the file
-    with open(json_path, 'r') as file:
-        json_data = json.load(file)
-        
-    # Define a structure for rows to store parsed data
+    import pandas as pd
+
+    columns = {name: [] for name in METRICS_COLUMNS}
+    runs, fetch_times = [], []
+    for record in records:
+        for metric, score in zip(METRIC_LABELS, record['numbers']):
+            runs.append(record.get('run'))
+            fetch_times.append(record.get('fetch_time'))
+            columns['run'].append(record.get('run'))
+            columns['category'].append(record['category'])
+            columns['page'].append(record['page'])
+            columns['mode'].append(record['mode'])
+            columns['device'].append(record['device'])
+            columns['metric'].append(metric)
+            columns['score'].append(score)
+            columns['source'].append(record['source'])
+
+    columns['run_timestamp'] = run_timestamps(runs, fetch_times)
+    frame = pd.DataFrame(columns)
+    for name in ['run'] + METRICS_KEY + ['source']:
+        frame[name] = frame[name].astype('category')
+    frame['metric'] = pd.Categorical(frame['metric'], categories=METRIC_LABELS)
+    frame['score'] = pd.to_numeric(frame['score'], errors='coerce').astype('float32')
+    return frame
+
+def metrics_store_schema():
+    """Arrow schema of the metrics store; dimensions are dictionary encoded like pandas categoricals."""
+    import pyarrow as pa
+
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [('run_timestamp', pa.timestamp('us', tz='UTC'))]
+        + [(name, dictionary) for name in ['run'] + METRICS_KEY + ['metric']]
+        + [('score', pa.float32()), ('source', dictionary)]
+    )
+
+def build_timings_frame(records):
+    """
+    Flatten the timings and top opportunities of merge records into one row per report.
+
+    Records without timings, such as those read by OCR, are left out.
+
+    :param records: Iterable of records returned by read_metric_file
+    :return: A DataFrame with float64 timing and savings columns and categorical dimensions
+    """
+    import pandas as pd
+
     rows = []
-    
-    # Iterate over JSON structure
-    for quality_entry in json_data:
-        for category_name, subcategories in quality_entry.items():
-            for subcategory_entry in subcategories:
-                for subcategory_name, modes in subcategory_entry.items():
-                    for mode_entry in modes:
-                        for mode_name, devices in mode_entry.items():
-                            for device_entry in devices:
-                                for device_name, values in device_entry.items():
-                                    # Ensure there are always 4 values for metrics (default NaN if missing)
-                                    metrics = values + [None] * (4 - len(values))
-                                    rows.append([
-                                        format_cell_value(category_name),  # Format category name
-                                        format_cell_value(subcategory_name),  # Format subcategory name
-                                        format_cell_value(mode_name),  # Format mode name
-                                        format_cell_value(device_name),
-                                        metrics[0], metrics[1], metrics[2], metrics[3]
-                                    ])
+    for record in records:
+        if not record.get('timings'):
+            continue
+        row = {
+            'run': record.get('run'),
+            'fetch_time': record.get('fetch_time'),
+            **{name: record[name] for name in METRICS_KEY},
+            **{column: record['timings'].get(column) for column in TIMING_COLUMNS},
+        }
+        for rank, opportunity in enumerate(record.get('opportunities') or [], start=1):
+            if rank > TOP_OPPORTUNITIES:
+                break
+            row[f'opportunity_{rank}'] = opportunity['id']
+            row[f'opportunity_{rank}_savings_ms'] = opportunity['savings_ms']
+            row[f'opportunity_{rank}_savings_bytes'] = opportunity['savings_bytes']
+        row['source'] = record['source']
+        rows.append(row)
+
+    frame = pd.DataFrame(rows)
+    if len(frame):
+        frame['run_timestamp'] = run_timestamps(frame['run'], frame['fetch_time'])
+    frame = frame.reindex(columns=timings_store_schema().names)
+    frame['run_timestamp'] = pd.to_datetime(frame['run_timestamp'], utc=True)
+    for name in METRICS_KEY + ['source']:
+        frame[name] = frame[name].astype('category')
+    for column in TIMING_COLUMNS + [column for column in OPPORTUNITY_COLUMNS if '_savings_' in column]:
+        frame[column] = pd.to_numeric(frame[column], errors='coerce').astype('float64')
+    for column in OPPORTUNITY_COLUMNS:
+        if '_savings_' not in column:
+            frame[column] = frame[column].astype('string')
+    return frame
+
+def timings_store_schema():
+    """Arrow schema of the timings store, sharing the dimension columns of the metrics store."""
+    import pyarrow as pa
+
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [('run_timestamp', pa.timestamp('us', tz='UTC'))]
+        + [(name, dictionary) for name in METRICS_KEY]
+        + [(column, pa.float64()) for column in TIMING_COLUMNS]
+        + [(column, pa.float64() if '_savings_' in column else pa.string()) for column in OPPORTUNITY_COLUMNS]
+        + [('source', dictionary)]
+    )
+
+def load_timings_frame(metrics='Metrics'):
+    """
+    Load the timings table written by merge_json_files.
+
+    :param metrics: The metrics directory or the timings store file itself
+    :return: A DataFrame with one row per report, or None if no timings were merged
+    """
+    import pandas as pd
+
+    if os.path.isdir(metrics):
+        metrics = os.path.join(metrics, TIMINGS_STORE)
+    if not os.path.exists(metrics):
+        return None
+    return pd.read_parquet(metrics)
+
+def load_metrics_frame(metrics='Metrics'):
+    """
+    Load the long-format metrics table written by merge_json_files.
+
+    :param metrics: The metrics directory, the store file itself, or an
+        already loaded DataFrame, which is returned unchanged
+    :return: A DataFrame with METRICS_COLUMNS
+    """
+    import pandas as pd
+
+    if isinstance(metrics, pd.DataFrame):
+        return metrics
+    if os.path.isdir(metrics):
+        metrics = os.path.join(metrics, METRICS_STORE)
+    frame = pd.read_parquet(metrics)
+    # Parquet keeps categories in order of appearance; restore gauge order
+    frame['metric'] = pd.Categorical(frame['metric'], categories=METRIC_LABELS)
+    return frame
+
+def latest_run(frame):
+    """Keep only the most recent score of every page, mode, device and metric."""
+    return (
+        frame.sort_values('run_timestamp', kind='stable', na_position='first')
+        .drop_duplicates(METRICS_KEY + ['metric'], keep='last')
+    )
+
+def scores_table(metrics, timings=None):
+    """
+    Convert the metrics store into one row per page, mode and device with a column per score.
+
+    When timings were merged, the latest timings and top opportunities of
+    each page, mode and device follow the score columns.
+
+    :param metrics: Metrics directory, store path or DataFrame, see load_metrics_frame
+    :param timings: Timings DataFrame, see load_timings_frame; by default it is
+        loaded from the same directory when metrics is a path
+    :return: A pandas DataFrame
+    """
+    import pandas as pd
+
+    if timings is None and isinstance(metrics, str):
+        timings = load_timings_frame(metrics if os.path.isdir(metrics) else os.path.dirname(metrics) or '.')
+    frame = latest_run(load_metrics_frame(metrics))
+
+    # One column per metric, in gauge order
+    df = (
+        frame.set_index(METRICS_KEY + ['metric'])['score']
+        .unstack('metric')
+        .reindex(columns=METRIC_LABELS)
+        .reset_index()
+    )
+
+    # Format category, page, mode and device names
+    for name in METRICS_KEY:
+        df[name] = df[name].astype(str).map(format_cell_value)
 
     # Define column names for DataFrame
-    columns = ["Category", "Subcategory", "Mode", "Device", 
-               "SEO", "Best Practice", "Accessibility", "Performance"]
+    df.columns = ["Category", "Subcategory", "Mode", "Device", 
+                  "SEO", "Best Practice", "Accessibility", "Performance"]
 
-    # Create the DataFrame
-    df = pd.DataFrame(rows, columns=columns)
+    if timings is not None and len(timings):
+        timings = (
+            timings.sort_values('run_timestamp', kind='stable', na_position='first')
+            .drop_duplicates(METRICS_KEY, keep='last')
+        )
+        keys = [timings[name].astype(str).map(format_cell_value) for name in METRICS_KEY]
+        timings = timings[TIMING_COLUMNS + OPPORTUNITY_COLUMNS].set_axis(
+            pd.MultiIndex.from_arrays(keys, names=list(df.columns[:4]))
+        )
+        df = df.join(timings, on=list(df.columns[:4]))
+    return df
 
-    df.to_excel("parsed_data.xlsx", index=False) 
+@timed('tabulate')
+def parse_json_to_dataframe(metrics, output_excel_path="parsed_data.xlsx", timings=None):
+    """
+    Write the score table of scores_table to its own Excel file.
 
-def calculate_metric_percentage(json_file_path, output_excel_path):
-    # Load JSON data
-    with open(json_file_path, "r") as file:
-        json_data = json.load(file)
-    
-    data = []
+    :param metrics: Metrics directory, store path or DataFrame, see load_metrics_frame
+    :param output_excel_path: Path of the Excel file to write
+    :param timings: Timings DataFrame, see scores_table
+    :return: A pandas DataFrame
+    """
+    df = scores_table(metrics, timings)
+    write_workbook(output_excel_path, {"Scores": df})
+    return df
+
+def aggregate_metrics(metrics, by, metric_labels=None):
+    """
+    Aggregate scores over any combination of dimensions in a single groupby pass.
+
+    Missing scores are skipped rather than counted as 0, so a page with fewer
+    devices or a failed audit is averaged over what was actually measured.
+    Scores are out of 100, so the mean is also the percentage of the maximum.
+
+    :param metrics: Metrics directory, store path or DataFrame, see load_metrics_frame
+    :param by: Columns to group by, any of run_timestamp, category, page, mode, device and metric;
+        leaving out 'metric' aggregates across the selected metrics
+    :param metric_labels: Only aggregate these metrics, defaults to all of them
+    :return: A DataFrame indexed by the by columns with mean, min, max, count
+        (scores present) and missing (scores absent)
+    """
+    frame = load_metrics_frame(metrics)
+    if metric_labels is not None:
+        frame = frame[frame['metric'].isin(metric_labels)]
+
+    result = frame.groupby(list(by), observed=True)['score'].agg(['mean', 'min', 'max', 'count', 'size'])
+    result['missing'] = result.pop('size') - result['count']
+    return result
+
+def metric_table(metrics, by, statistic='mean'):
+    """One row per group of by and one column per metric, in gauge order, holding the given statistic."""
+    return (
+        aggregate_metrics(metrics, list(by) + ['metric'])[statistic]
+        .unstack('metric')
+        .reindex(columns=METRIC_LABELS)
+    )
+
+def percentage_table(metrics):
+    """
+    Average the Best Practice, Performance and Accessibility scores of each page per mode.
+
+    :param metrics: Metrics directory, store path or DataFrame, see load_metrics_frame
+    :return: A pandas DataFrame with one row per page
+    """
+    import pandas as pd
+
+    frame = latest_run(load_metrics_frame(metrics))
     metric_labels = ["Best Practice", "Performance", "Accessibility"]
+    frame = frame[frame['mode'].isin(['timespan_mode', 'navigation_mode'])]
+
+    total = aggregate_metrics(frame, ['category', 'page'], metric_labels)['mean']
+    per_mode = (
+        aggregate_metrics(frame, ['category', 'page', 'mode'], metric_labels)['mean']
+        .unstack('mode')
+        .reindex(index=total.index, columns=['timespan_mode', 'navigation_mode'])
+    )
 
-    # Parse JSON
-    for category in json_data:
-        category_name = list(category.keys())[0]
-        subcategories = list(category.values())[0]
-
-        for subcategory in subcategories:
-            subcategory_name = list(subcategory.keys())[0]
-            modes = list(subcategory.values())[0]
-            
-            # Initialize metrics for both modes
-            timespan_sum = 0
-            navigation_sum = 0
-            
-            for mode in modes:
-                mode_name = list(mode.keys())[0]
-                devices = list(mode.values())[0]
-                
-                for device in devices:
-                    values = list(device.values())[0][:3]  # Best Practice, Performance, Accessibility
-                    
-                    if mode_name == "timespan_mode":
-                        timespan_sum += sum(values)
-                    elif mode_name == "navigation_mode":
-                        navigation_sum += sum(values)
-
-            # Normalize by 300 per mode, then by 600 for both modes combined
-            timespan_percentage = ((timespan_sum / 300)) * 100
-            navigation_percentage = ((navigation_sum / 300)) * 100
-            total_percentage = ((timespan_sum + navigation_sum) / 600) * 100
-            
-            # Append to data
-            data.append([subcategory_name, timespan_percentage, navigation_percentage, total_percentage])
-
-    # Create DataFrame
-    df = pd.DataFrame(data, columns=["Page", "Timespan Mode (%)", "Navigation Mode (%)", "Total Metric (%)"])
-
-    # Export to Excel
-    df.to_excel(output_excel_path, index=False)
+    return pd.DataFrame({
+        "Page": total.index.get_level_values('page'),
+        "Timespan Mode (%)": per_mode['timespan_mode'].to_numpy(),
+        "Navigation Mode (%)": per_mode['navigation_mode'].to_numpy(),
+        "Total Metric (%)": total.to_numpy(),
+    })
+
+@timed('percentage')
+def calculate_metric_percentage(metrics, output_excel_path):
+    """
+    Write the table of percentage_table to its own Excel file.
+
+    :param metrics: Metrics directory, store path or DataFrame, see load_metrics_frame
+    :param output_excel_path: Path of the Excel file to write
+    :return: A pandas DataFrame
+    """
+    df = percentage_table(metrics)
+    write_workbook(output_excel_path, {"Percentages": df})
 
     print(f"Data successfully saved to {output_excel_path}")
+    return df
 
+def breakdown_table(metrics, by):
+    """Mean, min and max of every metric per value of the by dimension, e.g. per device or per mode."""
+    table = aggregate_metrics(latest_run(load_metrics_frame(metrics)), [by, 'metric'])
+    table = table[['mean', 'min', 'max', 'count']].unstack('metric').reindex(columns=METRIC_LABELS, level=1)
+    # Flatten to 'SEO mean', 'SEO min', ... in gauge order
+    table = table.swaplevel(axis=1).reindex(columns=METRIC_LABELS, level=0)
+    table.columns = [f"{metric} {statistic}" for metric, statistic in table.columns]
+    table = table.reset_index()
+    table[by] = table[by].astype(str).map(format_cell_value)
+    return table.rename(columns={by: format_cell_value(by)})
 
+def history_table(metrics):
+    """Every score of every run in long format, oldest run first."""
+    frame = load_metrics_frame(metrics)
+    return frame.sort_values(['run_timestamp'] + METRICS_KEY + ['metric'], kind='stable', na_position='first')[
+        ['run_timestamp'] + METRICS_KEY + ['metric', 'score']
+    ]
 
-def merge_json_files(output_dir):
-    """Merge all extracted JSON files into a single JSON file with specific structure"""
-    merged_data = {}
+def write_workbook(output_path, sheets):
+    """
+    Stream DataFrames into one workbook, one sheet each, with xlsxwriter in constant-memory mode.
+
+    Rows are written strictly in order, a chunk of EXPORT_CHUNK_ROWS at a
+    time, so the writer keeps a single row in memory however long the sheet
+    is. pandas' to_excel cannot be used in this mode because it writes
+    column by column. A sheet longer than Excel allows continues on
+    '<name> (2)' and so on. The workbook is built in a temporary file and
+    moved into place, so readers and concurrent jobs never see half a file.
+
+    :param output_path: Path of the .xlsx file to write
+    :param sheets: Dict of sheet name to DataFrame, in sheet order
+    """
+    import xlsxwriter
+
+    temp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    workbook = xlsxwriter.Workbook(temp_path, {
+        'constant_memory': True,
+        'remove_timezone': True,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+    })
+    try:
+        header = workbook.add_format({'bold': True})
+        for name, frame in sheets.items():
+            columns = [str(column) for column in frame.columns]
+            part = 1
+            worksheet = workbook.add_worksheet(name)
+            worksheet.write_row(0, 0, columns, header)
+            row = 1
+            for start in range(0, len(frame), EXPORT_CHUNK_ROWS):
+                chunk = frame.iloc[start:start + EXPORT_CHUNK_ROWS].astype(object)
+                # Missing values become empty cells; everything else is a plain Python value
+                for values in chunk.where(chunk.notna(), None).to_numpy().tolist():
+                    if row == EXCEL_MAX_ROWS:
+                        part += 1
+                        worksheet = workbook.add_worksheet(f"{name} ({part})")
+                        worksheet.write_row(0, 0, columns, header)
+                        row = 1
+                    worksheet.write_row(row, 0, values)
+                    row += 1
+    finally:
+        workbook.close()
+    os.replace(temp_path, output_path)
+
+@timed('export')
+def export_workbook(metrics='Metrics', output_path=None, csv=False, parquet=False):
+    """
+    Export every table to one multi-sheet workbook: scores, percentages, per device, per mode and history.
+
+    :param metrics: Metrics directory or store path; the timings are read from the same directory
+    :param output_path: Workbook path, EXPORT_WORKBOOK in the metrics directory by default,
+        so jobs working on different metrics directories never overwrite each other
+    :param csv: Also write every sheet as <workbook name>_<sheet>.csv next to the workbook
+    :param parquet: Also write every sheet as <workbook name>_<sheet>.parquet next to the workbook
+    :return: Path of the workbook
+    """
+    metrics_dir = metrics if os.path.isdir(metrics) else os.path.dirname(metrics) or '.'
+    if output_path is None:
+        output_path = os.path.join(metrics_dir, EXPORT_WORKBOOK)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+
+    # Load the store once and share it between the tables
+    frame = load_metrics_frame(metrics)
+    sheets = {
+        "Scores": scores_table(frame, load_timings_frame(metrics_dir)),
+        "Percentages": percentage_table(frame),
+        "Per Device": breakdown_table(frame, 'device'),
+        "Per Mode": breakdown_table(frame, 'mode'),
+        "History": history_table(frame),
+    }
+    write_workbook(output_path, sheets)
+    print(f"Workbook saved to: {output_path}")
+
+    stem = os.path.splitext(output_path)[0]
+    for name, sheet in sheets.items():
+        sibling = f"{stem}_{name.lower().replace(' ', '_')}"
+        if csv:
+            sheet.to_csv(f"{sibling}.csv", index=False)
+        if parquet:
+            sheet.to_parquet(f"{sibling}.parquet", index=False)
+    if csv or parquet:
+        print(f"Sheets also saved as {' and '.join(f for f, on in (('CSV', csv), ('Parquet', parquet)) if on)} next to it")
+    return output_path
+
+def load_manifest(manifest_path):
+    """Load a manifest written by save_manifest, or an empty one if it is missing or unreadable."""
+    try:
+        with open(manifest_path, 'r') as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest_path, manifest):
+    """Atomically replace a manifest so an interrupted run never leaves it half written."""
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file)
+    os.replace(temp_path, manifest_path)
+
+def file_signature(file_path):
+    """Return the (size, mtime in ns) pair used to cheaply detect unchanged files."""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+def file_digest(file_path):
+    """Return the SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(LHR_READ_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def scan_metric_files(output_dir, relative_dir=''):
+    """
+    Yield every per-report JSON file below output_dir, depth first.
+
+    :return: Generator of (path relative to output_dir with '/' separators, size, mtime in ns)
+    """
+    with os.scandir(os.path.join(output_dir, relative_dir)) as entries:
+        for entry in entries:
+            relative_path = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                yield from scan_metric_files(output_dir, relative_path)
+            elif entry.name.endswith('.json') and entry.name not in NON_REPORT_JSON:
+                stat = entry.stat()
+                yield relative_path, stat.st_size, stat.st_mtime_ns
+
+def read_metric_file(output_dir, relative_path):
+    """
+    Read one per-report JSON file into a merge record.
+
+    :return: (record, error); exactly one of them is None. The error is a dict
+        with the path, the stage that failed ('path' or 'read') and the message
+    """
+    match = METRIC_FILE_PATTERN.match(relative_path)
+    if match is None:
+        return None, {"path": relative_path, "stage": "path",
+                      "error": "expected [run/][category/]page/[mode/]<page>_<mode>_<device>.json"}
+
+    # Folders above the page are the run timestamp and/or the category
+    run, category = None, None
+    for folder in match['prefix'].split('/')[:-1]:
+        if run is None and RUN_FOLDER_PATTERN.match(folder):
+            run = folder
+        elif category is None:
+            category = folder
+
+    try:
+        with open(os.path.join(output_dir, relative_path), 'r') as json_file:
+            json_data = json.load(json_file)
+    except (OSError, ValueError) as e:
+        return None, {"path": relative_path, "stage": "read", "error": str(e)}
+
+    return {
+        "source": relative_path,
+        "run": run,
+        "category": category or DEFAULT_CATEGORY,
+        "page": match['page'],
+        # Mode comes from the parent folder, or from the file name when there is none
+        "mode": match['mode'] or match['file_mode'],
+        "device": match['device'],
+        "numbers": json_data.get('extracted_numbers', []),
+        "fetch_time": json_data.get('fetch_time'),
+        "timings": json_data.get('timings'),
+        "opportunities": json_data.get('opportunities'),
+    }, None
+
+def copy_store_rows(store_path, writer, exclude):
+    """Stream the rows of an existing store into writer, one record batch at a time, dropping excluded sources."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    excluded = pa.array(sorted(exclude), type=pa.string())
+    for batch in pq.ParquetFile(store_path).iter_batches():
+        table = pa.Table.from_batches([batch]).cast(writer.schema)
+        if len(excluded):
+            keep = pc.invert(pc.is_in(table['source'].cast(pa.string()), value_set=excluded))
+            table = table.filter(keep)
+        if table.num_rows:
+            writer.write_table(table)
+
+def write_legacy_json(store_path, merged_json_path):
+    """Write the nested category/page/mode/device merged_data.json from the metrics store."""
+    frame = load_metrics_frame(store_path)
 
-    # Walk through the output directory to find all JSON files
-    for root, dirs, files in os.walk(output_dir):
-        for filename in files:
-            if filename.endswith('.json') and filename != 'merged_data.json':
-                file_path = os.path.join(root, filename)
-                try:
-                    # Load the JSON data from the file
-                    with open(file_path, 'r') as json_file:
-                        json_data = json.load(json_file)
-                    
-                    # Extract components from the file path
-                    path_parts = os.path.relpath(root, output_dir).split(os.sep)
-                    if len(path_parts) >= 2:  # Expecting structure: category/subcategory/mode/
-                        category = path_parts[0]
-                        subcategory = path_parts[1]
-                        
-                        # Extract mode from the parent folder name
-                        if len(path_parts) >= 3:
-                            mode = path_parts[2]
-                        else:
-                            mode = filename.split('_')[-2]  # Fallback to extract from filename
-                        
-                        # Extract device type from filename
-                        device = filename.split('_')[-1].split('.')[0]
-                        
-                        # Initialize nested structure if not exists
-                        if category not in merged_data:
-                            merged_data[category] = {}
-                        if subcategory not in merged_data[category]:
-                            merged_data[category][subcategory] = {}
-                        if mode not in merged_data[category][subcategory]:
-                            merged_data[category][subcategory][mode] = {}
-                        if device not in merged_data[category][subcategory][mode]:
-                            merged_data[category][subcategory][mode][device] = []
-                        
-                        # Add the extracted numbers
-                        merged_data[category][subcategory][mode][device].extend(json_data.get('extracted_numbers', []))
-                
-                except Exception as e:
-                    print(f"Error loading JSON from {file_path}: {str(e)}")
-    
-    # Convert the dictionary to the desired list format
     formatted_data = []
-    for category, subcategories in merged_data.items():
+    for category, category_rows in frame.groupby('category', observed=True, sort=False):
         category_data = {category: []}
-        for subcategory, modes in subcategories.items():
+        for subcategory, subcategory_rows in category_rows.groupby('page', observed=True, sort=False):
             subcategory_data = {subcategory: []}
-            for mode, devices in modes.items():
+            for mode, mode_rows in subcategory_rows.groupby('mode', observed=True, sort=False):
                 mode_data = {mode: []}
-                for device, values in devices.items():
-                    device_data = {device: values}
-                    mode_data[mode].append(device_data)
+                for device, device_rows in mode_rows.groupby('device', observed=True, sort=False):
+                    values = [None if v != v else int(v) for v in device_rows['score']]
+                    mode_data[mode].append({device: values})
                 subcategory_data[subcategory].append(mode_data)
             category_data[category].append(subcategory_data)
         formatted_data.append(category_data)
-    
-    # Save the merged JSON data to a final output file
-    merged_json_path = os.path.join(output_dir, 'merged_data.json')
+
     with open(merged_json_path, 'w') as merged_file:
         json.dump(formatted_data, merged_file, indent=4)
-    
     print(f"Merged JSON saved to: {merged_json_path}")
 
-    # # Save merged data to Excel
-    # excel_path = os.path.join(output_dir, 'metrics_report.xlsx')
-
-    # # Convert merged data to DataFrame-friendly format
-    # flattened_data = []
-
-    # for category, subcategories in merged_data.items():
-    #     for subcategory, modes in subcategories.items():
-    #         for mode, devices in modes.items():
-    #             for device, values in devices.items():
-    #                 flattened_data.append({
-    #                     "Category": category,
-    #                     "Subcategory": subcategory,
-    #                     "Mode": mode,
-    #                     "Device": device,
-    #                     "Scores": values
-    #                 })
-
-    # # Create DataFrame and save to Excel
-    # df = pd.DataFrame(flattened_data)
-    # df.to_excel(excel_path, index=False)
-    # print(f"Excel report saved to: {excel_path}")
-
-    # After saving the JSON file, create the summary plot
-    # create_summary_plot(formatted_data, output_dir)
-    parse_json_to_dataframe(merged_json_path)
-    # calculate_metric_percentage(merged_json_path, "metric.xlsx")
-    
+def open_history_store(output_dir):
+    """Open (and create if needed) the SQLite history store in the metrics directory."""
+    connection = sqlite3.connect(os.path.join(output_dir, HISTORY_STORE))
+    connection.executescript(HISTORY_SCHEMA)
+    return connection
+
+def update_history_store(connection, frame=None, stale_sources=()):
+    """
+    Replace the history rows of changed files.
+
+    :param connection: Connection from open_history_store
+    :param frame: Metrics rows to insert, as built by build_metrics_frame
+    :param stale_sources: Source files whose previous rows are deleted first
+    """
+    with connection:
+        connection.executemany(
+            "DELETE FROM scores WHERE source = ?", ((source,) for source in stale_sources)
+        )
+        if frame is not None and len(frame):
+            # ISO timestamps in UTC sort the same as text and as time
+            run_timestamps = frame['run_timestamp'].map(
+                lambda timestamp: None if timestamp != timestamp else timestamp.isoformat()
+            )
+            connection.executemany(
+                "INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                zip(
+                    run_timestamps,
+                    *(frame[name].astype(str) for name in METRICS_KEY + ['metric']),
+                    (None if score != score else float(score) for score in frame['score']),
+                    frame['source'].astype(str),
+                ),
+            )
+
+@timed('regressions')
+def find_regressions(output_dir='Metrics', window=5, threshold=10, since=None, metric=None):
+    """
+    Compare every score with the runs before it and flag drops.
+
+    For each category, page, mode, device and metric the delta is taken
+    against the previous run and the baseline is the mean of the previous
+    `window` runs. The query runs on the indexed history store, so no
+    report or per-report JSON file is read.
+
+    :param output_dir: Metrics directory holding the history store
+    :param window: Number of previous runs the baseline is averaged over
+    :param threshold: Points below the baseline at which a score is flagged
+    :param since: Only return runs at or after this ISO timestamp, e.g. a week ago
+    :param metric: Only return this metric, e.g. 'Performance'
+    :return: A DataFrame of the selected runs with delta, baseline, drop
+        (baseline minus score) and regression (drop greater than threshold)
+    """
+    import pandas as pd
+
+    window = int(window)
+    if window < 1:
+        raise ValueError("window must be at least 1")
+
+    query = f"""
+        SELECT * FROM (
+            SELECT run_timestamp, category, page, mode, device, metric, score,
+                   score - LAG(score) OVER series AS delta,
+                   AVG(score) OVER (series ROWS BETWEEN {window} PRECEDING AND 1 PRECEDING) AS baseline
+            FROM scores
+            WHERE run_timestamp IS NOT NULL AND (:metric IS NULL OR metric = :metric)
+            WINDOW series AS (PARTITION BY category, page, mode, device, metric ORDER BY run_timestamp)
+        )
+        WHERE (:since IS NULL OR run_timestamp >= :since)
+        ORDER BY run_timestamp, category, page, mode, device, metric
+    """
+    if since is not None:
+        since = pd.Timestamp(since)
+        since = (since.tz_localize('UTC') if since.tzinfo is None else since.tz_convert('UTC')).isoformat()
+
+    connection = open_history_store(output_dir)
+    try:
+        regressions = pd.read_sql_query(query, connection, params={"since": since, "metric": metric})
+    finally:
+        connection.close()
+
+    regressions['run_timestamp'] = pd.to_datetime(regressions['run_timestamp'], utc=True, format='ISO8601')
+    regressions['drop'] = regressions['baseline'] - regressions['score']
+    regressions['regression'] = regressions['drop'] > threshold
+    return regressions
+
+@timed('merge')
+def merge_json_files(output_dir, incremental=True, legacy_json=False):
+    """
+    Merge all extracted JSON files into the long-format metrics store.
+
+    Files are found with os.scandir, read in bounded batches on a thread pool
+    and appended to the Parquet store one row group at a time, so memory does
+    not grow with the number of runs kept. On reruns only files whose size or
+    mtime changed are read; the rows of all other files are streamed over from
+    the previous store. The same rows are upserted into the indexed SQLite
+    history store, and the timings of LHR reports are written to a wide
+    timings store alongside. Files that cannot be used are listed in
+    merge_errors.json.
+
+    :param output_dir: Directory holding the per-report JSON files
+    :param incremental: Reuse the manifest and store from the previous merge
+    :param legacy_json: Also write the nested merged_data.json
+    :return: Path of the metrics store
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    manifest_path = os.path.join(output_dir, MERGE_MANIFEST)
+    store_path = os.path.join(output_dir, METRICS_STORE)
+    timings_path = os.path.join(output_dir, TIMINGS_STORE)
+    errors_path = os.path.join(output_dir, MERGE_ERRORS)
+    manifest = load_manifest(manifest_path) if incremental else {}
+    if (manifest.get('version') != MERGE_MANIFEST_VERSION or not os.path.exists(store_path)
+            or not os.path.exists(timings_path)
+            or not os.path.exists(os.path.join(output_dir, HISTORY_STORE))):
+        manifest = {}
+    previous = manifest.get('files', {})
+
+    # Only the (size, mtime) of each file is kept in memory, never its scores
+    current = {}
+    changed = []
+    for relative_path, size, mtime in scan_metric_files(output_dir):
+        current[relative_path] = [size, mtime]
+        if previous.get(relative_path) != [size, mtime]:
+            changed.append(relative_path)
+    removed = [relative_path for relative_path in previous if relative_path not in current]
+    print(f"Merging {len(current)} JSON files ({len(changed)} changed, {len(removed)} removed)")
+
+    # Without a usable manifest the store may not exist yet, so it is written even when empty
+    if manifest and not changed and not removed:
+        print(f"Metrics store is up to date: {store_path}")
+    else:
+        errors = []
+        temp_path = store_path + '.tmp'
+        timings_temp_path = timings_path + '.tmp'
+        schema = metrics_store_schema()
+        timings_schema = timings_store_schema()
+        history = open_history_store(output_dir)
+        if previous:
+            update_history_store(history, stale_sources=changed + removed)
+        else:
+            # Full rebuild: start the history over as well
+            with history:
+                history.execute("DELETE FROM scores")
+
+        with pq.ParquetWriter(temp_path, schema) as writer, \
+                pq.ParquetWriter(timings_temp_path, timings_schema) as timings_writer:
+            # Carry over the rows of files that did not change
+            if previous:
+                copy_store_rows(store_path, writer, exclude=set(changed) | set(removed))
+                copy_store_rows(timings_path, timings_writer, exclude=set(changed) | set(removed))
+
+            # Read the changed files in bounded batches, a thread pool hiding file latency
+            read = functools.partial(read_metric_file, output_dir)
+            with ThreadPoolExecutor(max_workers=MERGE_READ_THREADS) as executor:
+                for start in range(0, len(changed), MERGE_BATCH_SIZE):
+                    records = []
+                    for relative_path, (record, error) in zip(
+                        changed[start:start + MERGE_BATCH_SIZE],
+                        executor.map(read, changed[start:start + MERGE_BATCH_SIZE]),
+                    ):
+                        if error is not None:
+                            errors.append(error)
+                            count('merge_errors')
+                            # Forget the file so the next merge tries it again
+                            current.pop(relative_path)
+                        else:
+                            records.append(record)
+                    if records:
+                        count('files_merged', len(records))
+                        frame = build_metrics_frame(records)
+                        writer.write_table(pa.Table.from_pandas(frame, preserve_index=False).cast(schema))
+                        update_history_store(history, frame)
+                        timings = build_timings_frame(records)
+                        if len(timings):
+                            timings_writer.write_table(
+                                pa.Table.from_pandas(timings, preserve_index=False).cast(timings_schema)
+                            )
+
+        history.close()
+        os.replace(temp_path, store_path)
+        os.replace(timings_temp_path, timings_path)
+        save_manifest(manifest_path, {"version": MERGE_MANIFEST_VERSION, "files": current})
+        print(f"Metrics store saved to: {store_path}")
+
+        # Structured report of every file that could not be merged
+        with open(errors_path, 'w') as errors_file:
+            json.dump({"errors": errors}, errors_file, indent=4)
+        if errors:
+            print(f"{len(errors)} files could not be merged, see {errors_path}")
+
+    if legacy_json:
+        write_legacy_json(store_path, os.path.join(output_dir, 'merged_data.json'))
+
+    return store_path
+
+def load_lhr_from_html(file_path):
+    """
+    Stream the Lighthouse result JSON out of an HTML report.
+
+    Lighthouse escapes every '<' inside the embedded JSON, so the first
+    '</script>' after the marker is guaranteed to close it and the file only
+    has to be read up to that point.
+
+    :param file_path: Path to the HTML report
+    :return: The Lighthouse result dict, or None if the report has no embedded JSON
+    """
+    tail = ''
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+        # Find the marker, keeping a short tail in case it straddles two chunks
+        while True:
+            chunk = file.read(LHR_READ_CHUNK_SIZE)
+            if not chunk:
+                return None
+            window = tail + chunk
+            match = LHR_JSON_MARKER.search(window)
+            if match:
+                break
+            tail = window[-64:]
+
+        # Collect the JSON up to the closing script tag
+        parts = [window[match.end():]]
+        while True:
+            # Include the end of the previous chunk in case the tag was split
+            carry = parts[-2][-8:] if len(parts) > 1 else ''
+            found = (carry + parts[-1]).find('</script>')
+            if found >= 0:
+                end = found - len(carry)
+                if end < 0:
+                    # The tag started in the previous chunk
+                    parts.pop()
+                parts[-1] = parts[-1][:end]
+                break
+            chunk = file.read(LHR_READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            parts.append(chunk)
+
+    try:
+        lhr, _ = json.JSONDecoder().raw_decode(''.join(parts).lstrip())
+    except ValueError:
+        return None
+    return lhr
+
+def report_stem(filename):
+    """Strip the report suffix, so page_mode_device.html and page_mode_device.json.gz share a name."""
+    for suffix in REPORT_SUFFIXES:
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)]
+    return os.path.splitext(filename)[0]
+
+def load_lhr(file_path):
+    """
+    Load the Lighthouse result of a report saved as gzip JSON or as HTML.
+
+    :param file_path: Path to a .json.gz or .html report
+    :return: The Lighthouse result dict, or None if it cannot be read
+    """
+    if not file_path.endswith('.json.gz'):
+        return load_lhr_from_html(file_path)
+    try:
+        with gzip.open(file_path, 'rt', encoding='utf-8') as json_file:
+            return json.load(json_file)
+    except (OSError, ValueError):
+        return None
+
+def extract_scores_from_lhr(lhr):
+    """
+    Read the category scores shown on the report gauges from a Lighthouse result.
+
+    :param lhr: Lighthouse result dict
+    :return: Dict of metric label to 0-100 score, None where Lighthouse reported no score
+    """
+    categories = lhr.get('categories') or {}
+    scores = {}
+    for label, category_id in LHR_CATEGORY_IDS.items():
+        score = (categories.get(category_id) or {}).get('score')
+        # Match the report renderer, which shows Math.round(score * 100)
+        scores[label] = None if score is None else int(score * 100 + 0.5)
+    return scores
+
+def extract_timings_from_lhr(lhr):
+    """
+    Read the Core Web Vitals, timings and main-thread breakdown from a Lighthouse result.
+
+    :param lhr: Lighthouse result dict
+    :return: Dict of TIMING_COLUMNS to float, None where the audit did not run
+    """
+    audits = lhr.get('audits') or {}
+    timings = {column: None for column in TIMING_COLUMNS}
+    for column, audit_id in TIMING_AUDITS.items():
+        value = (audits.get(audit_id) or {}).get('numericValue')
+        timings[column] = None if value is None else float(value)
+
+    breakdown = ((audits.get('mainthread-work-breakdown') or {}).get('details') or {}).get('items') or []
+    for item in breakdown:
+        column = MAINTHREAD_COLUMNS.get(item.get('group'))
+        if column and item.get('duration') is not None:
+            timings[column] = float(item['duration'])
+    return timings
+
+def extract_opportunities_from_lhr(lhr, limit=TOP_OPPORTUNITIES):
+    """
+    List the opportunities with the largest estimated savings.
+
+    :param lhr: Lighthouse result dict
+    :param limit: Number of opportunities to keep
+    :return: List of dicts with the audit id, title, savings_ms and savings_bytes, largest first
+    """
+    opportunities = []
+    for audit_id, audit in (lhr.get('audits') or {}).items():
+        details = audit.get('details') or {}
+        if details.get('type') != 'opportunity':
+            continue
+        savings_ms = details.get('overallSavingsMs') or 0
+        savings_bytes = details.get('overallSavingsBytes') or 0
+        if savings_ms > 0 or savings_bytes > 0:
+            opportunities.append({
+                "id": audit_id,
+                "title": audit.get('title', audit_id),
+                "savings_ms": float(savings_ms),
+                "savings_bytes": float(savings_bytes),
+            })
+    opportunities.sort(key=lambda opportunity: (opportunity['savings_ms'], opportunity['savings_bytes']), reverse=True)
+    return opportunities[:limit]
+
+def save_extracted_numbers(file_path, output_dir, json_data):
+    """Save the extracted data of a report to a JSON file named after it."""
+    # Use the original report filename (without extension) as the JSON filename
+    json_filename = report_stem(os.path.basename(file_path)) + '.json'
+    json_path = os.path.join(output_dir, json_filename)
+
+    with open(json_path, 'w') as json_file:
+        json.dump(json_data, json_file, indent=4)
+    print(f"Extracted numbers saved to: {json_path}")
+    return json_path
+
+def extract_report(file_path, output_dir, parser='lhr', get_driver=None, tess_api=None,
+                   ocr_engine='tesseract', timeout=REPORT_TIME_BUDGET, ocr_batch=None):
+    """
+    Extract the category scores of a single report.
+
+    :param file_path: Path to the HTML or .json.gz report
+    :param output_dir: Directory the per-report JSON file is written to
+    :param parser: 'lhr' reads the JSON embedded in the report and only falls back
+        to screenshots and OCR when it is missing; 'ocr' always uses OCR.
+        A .json.gz report is always read as JSON, there is nothing to screenshot
+    :param get_driver: Callable returning a Selenium driver, only called for OCR
+    :param tess_api: Optional long-lived tesserocr engine used for OCR
+    :param ocr_engine: 'tesseract', or 'template' to try the glyph classifier first
+    :param timeout: Seconds an OCR extraction may take in the browser, see capture_gauges
+    :param ocr_batch: Optional list; a report that needs OCR then only has its
+        gauges captured, and the capture is appended to it and returned in place
+        of the JSON data, to be read with other reports by read_gauge_batch
+    :return: The saved JSON data, or None if a .json.gz report is unreadable
+    """
+    if file_path.endswith('.json.gz'):
+        parser = 'lhr'
+    if parser == 'lhr':
+        with timed_stage('lhr_read'):
+            lhr = load_lhr(file_path)
+        if lhr is not None:
+            count('lhr_reports')
+            scores = extract_scores_from_lhr(lhr)
+            json_data = {
+                "extracted_numbers": [scores[label] for label in METRIC_LABELS],
+                "scores": scores,
+                "fetch_time": lhr.get('fetchTime'),
+                "timings": extract_timings_from_lhr(lhr),
+                "opportunities": extract_opportunities_from_lhr(lhr),
+                "source": "lhr",
+            }
+            save_extracted_numbers(file_path, output_dir, json_data)
+            return json_data
+        if file_path.endswith('.json.gz'):
+            print(f"Unreadable Lighthouse JSON in {file_path}")
+            return None
+        print(f"No Lighthouse JSON in {file_path}, falling back to OCR")
+    elif parser != 'ocr':
+        raise ValueError(f"Unknown parser: {parser}")
+
+    count('ocr_reports')
+    if ocr_batch is None:
+        return take_screenshot_and_ocr(get_driver(), file_path, output_dir, tess_api, ocr_engine, timeout)
+    capture = capture_gauges(get_driver(), file_path, output_dir, timeout)
+    ocr_batch.append(capture)
+    return capture
+
+def create_tesseract_api():
+    """Start a reusable Tesseract engine for single digits, or None when tesserocr is not installed."""
+    # tesserocr keeps one Tesseract engine alive per worker instead of spawning a process per gauge
+    try:
+        import tesserocr
+    except ImportError:
+        return None
+    api = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SINGLE_CHAR)
+    api.SetVariable('tessedit_char_whitelist', '0123456789')
+    return api
+
+def ocr_digits(thresholded, tess_api=None, timeout=OCR_TIME_BUDGET):
+    """
+    Run OCR on a preprocessed gauge crop, using the long-lived engine when one is given.
+
+    :param timeout: Seconds the Tesseract process may take; tesserocr runs in
+        this process and cannot be interrupted, so its calls are not bounded
+    """
+    import pytesseract
+    from PIL import Image
+
+    if tess_api is not None:
+        tess_api.SetImage(Image.fromarray(thresholded))
+        return tess_api.GetUTF8Text()
+    return pytesseract.image_to_string(thresholded, config=TESSERACT_DIGITS_CONFIG, timeout=timeout)
+
+def threshold_gauge(cropped_circle):
+    """Preprocess a cropped gauge for OCR: grayscale and Otsu binarisation."""
+    import cv2
+
+    cropped_gray = cv2.cvtColor(cropped_circle, cv2.COLOR_BGR2GRAY)
+    _, thresholded = cv2.threshold(cropped_gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return thresholded
+
+def locate_gauge_crops(image_cv):
+    """Find the score gauges with a Hough circle search and return their thresholded crops."""
+    import cv2
+    import numpy as np
 
-def extract_numbers_from_circles(image_cv):
     gray = cv2.cvtColor(image_cv, cv2.COLOR_BGR2GRAY)
 
     # Use Hough Circle Transform to detect circles
@@ -220,389 +1292,1269 @@ def extract_numbers_from_circles(image_cv):
         param1=50, param2=30, minRadius=20, maxRadius=60
     )
 
-    extracted_texts = []
-
+    crops = []
     if circles is not None:
         circles = np.round(circles[0, :]).astype("int")
         for (x, y, r) in circles:
             # Crop the region inside each circle
             x1, y1, x2, y2 = max(0, x - r), max(0, y - r), x + r, y + r
-            cropped_circle = image_cv[y1:y2, x1:x2]
-
-            # Preprocess the cropped circle for better OCR
-            cropped_gray = cv2.cvtColor(cropped_circle, cv2.COLOR_BGR2GRAY)
-            _, thresholded = cv2.threshold(cropped_gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-
-            # Run OCR on the preprocessed circle region
-            text = pytesseract.image_to_string(thresholded, config='--psm 10 -c tessedit_char_whitelist=0123456789')
-            if text.strip():  # If text is not empty, process it
-                # Parse the text as a number
-                try:
-                    number = int(text.strip())
-                    if number > 100:
-                        number = 100  
-                    extracted_texts.append(number)
-                except ValueError:
-                    extracted_texts.append(0)  
-            else:
-                extracted_texts.append(0)
+            crops.append(threshold_gauge(image_cv[y1:y2, x1:x2]))
+    return crops
+
+def parse_gauge_text(text):
+    """Turn the OCR text of one gauge into a score, 0 when nothing usable was read."""
+    text = text.strip()
+    if not text:
+        count('zero_fallbacks')
+        return 0
+    # Parse the text as a number
+    try:
+        number = int(text)
+    except ValueError:
+        count('zero_fallbacks')
+        return 0
+    return min(number, 100)
+
+def tile_gauge_crops(crops, columns=GAUGE_TILE_COLUMNS, cell_size=GAUGE_TILE_CELL_SIZE):
+    """
+    Tile thresholded gauge crops into one white image for a single OCR pass.
 
-    return extracted_texts
+    Every crop is padded to a square with white, so its digits keep their
+    shape, and scaled into a fixed-size cell with a white margin, so a
+    recognised word can be mapped back to its gauge from its position alone.
+
+    :return: The tiled grayscale image
+    """
+    import cv2
+    import numpy as np
+
+    rows = (len(crops) + columns - 1) // columns
+    tiled = np.full((rows * cell_size, min(len(crops), columns) * cell_size), 255, dtype=np.uint8)
+    margin = cell_size // 8
+    inner = cell_size - 2 * margin
+    for index, crop in enumerate(crops):
+        top = (index // columns) * cell_size + margin
+        left = (index % columns) * cell_size + margin
+        # Crops cut from element rects need not be square
+        height, width = crop.shape[:2]
+        side = max(height, width)
+        top_pad, left_pad = (side - height) // 2, (side - width) // 2
+        square = cv2.copyMakeBorder(
+            crop, top_pad, side - height - top_pad, left_pad, side - width - left_pad,
+            cv2.BORDER_CONSTANT, value=255,
+        )
+        tiled[top:top + inner, left:left + inner] = cv2.resize(
+            square, (inner, inner), interpolation=cv2.INTER_AREA
+        )
+    return tiled
+
+def recognize_gauges_batched(crops, columns=GAUGE_TILE_COLUMNS, cell_size=GAUGE_TILE_CELL_SIZE,
+                             timeout=OCR_TIME_BUDGET):
+    """
+    Read the scores of many gauges with one Tesseract process.
+
+    The crops may come from one report or from a whole batch of reports; they
+    are tiled into a grid, read with a single image_to_data call and every box
+    is mapped back to the cell it falls in.
+
+    :param crops: Thresholded gauge crops, as returned by locate_gauge_crops
+    :param timeout: Seconds the Tesseract process may take before it is
+        killed and a RuntimeError is raised
+    :return: One score per crop, in the same order
+    """
+    import pytesseract
+
+    if not crops:
+        return []
+
+    tiled = tile_gauge_crops(crops, columns, cell_size)
+    data = pytesseract.image_to_data(
+        tiled, config=TESSERACT_BATCH_CONFIG, output_type=pytesseract.Output.DICT, timeout=timeout
+    )
+
+    texts = [''] * len(crops)
+    for text, left, top, width, height in zip(
+        data['text'], data['left'], data['top'], data['width'], data['height']
+    ):
+        if not text.strip():
+            continue
+        # Boxes come back in reading order, so words of one cell concatenate left to right
+        row = (top + height // 2) // cell_size
+        column = (left + width // 2) // cell_size
+        index = row * columns + column
+        if column < columns and index < len(crops):
+            texts[index] += text.strip()
+
+    return [parse_gauge_text(text) for text in texts]
+
+def normalise_glyph(ink):
+    """Scale a tight digit crop (ink > 0) to the glyph height and centre it, keeping its aspect ratio."""
+    import cv2
+    import numpy as np
+
+    height, width = ink.shape
+    scaled_width = max(1, min(GLYPH_WIDTH, int(round(width * GLYPH_HEIGHT / height))))
+    resized = cv2.resize(ink.astype(np.float32), (scaled_width, GLYPH_HEIGHT), interpolation=cv2.INTER_AREA)
+    glyph = np.zeros((GLYPH_HEIGHT, GLYPH_WIDTH), dtype=np.float32)
+    offset = (GLYPH_WIDTH - scaled_width) // 2
+    glyph[:, offset:offset + scaled_width] = resized
+    return glyph
+
+def segment_digits(thresholded):
+    """
+    Cut the digits out of a thresholded gauge crop, left to right.
+
+    Connected components are kept when they sit near the centre of the gauge
+    and have a digit-like height, which drops the surrounding score arc.
+
+    :return: List of normalised glyph arrays
+    """
+    import cv2
+    import numpy as np
+
+    ink = (thresholded < 128).astype(np.uint8)
+    height, width = ink.shape
+    # Digits are dark on the light gauge fill; flip crops that came out inverted
+    centre = ink[height // 4:3 * height // 4, width // 4:3 * width // 4]
+    if centre.size and centre.mean() > 0.5:
+        ink = 1 - ink
+
+    _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    stats = stats[1:]
+    centre_x = stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH] / 2
+    centre_y = stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT] / 2
+    keep = (
+        (np.abs(centre_x - width / 2) < 0.35 * width)
+        & (np.abs(centre_y - height / 2) < 0.2 * height)
+        & (stats[:, cv2.CC_STAT_HEIGHT] >= 0.2 * height)
+        & (stats[:, cv2.CC_STAT_HEIGHT] <= 0.6 * height)
+    )
+    boxes = stats[keep]
+    boxes = boxes[np.argsort(boxes[:, cv2.CC_STAT_LEFT])]
+    return [
+        normalise_glyph(ink[y:y + h, x:x + w])
+        for x, y, w, h, _ in boxes
+    ]
+
+def flatten_glyphs(glyphs):
+    """Stack glyphs into zero-mean, unit-norm rows so a dot product is their correlation."""
+    import numpy as np
+
+    matrix = np.asarray(glyphs, dtype=np.float32).reshape(len(glyphs), -1)
+    matrix = matrix - matrix.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+def render_glyph_templates():
+    """
+    Render 0-9 templates with OpenCV's built-in sans font.
+
+    Its digits do not look like the Roboto digits of real gauges, so these
+    only stand in for a calibrated glyph set when classify_gauges is called
+    directly; recognize_gauges never uses them.
+    """
+    import cv2
+    import numpy as np
+
+    glyphs = []
+    for digit in range(10):
+        canvas = np.zeros((64, 48), dtype=np.uint8)
+        cv2.putText(canvas, str(digit), (4, 52), cv2.FONT_HERSHEY_SIMPLEX, 1.8, 1, 4)
+        rows, columns = np.nonzero(canvas)
+        glyphs.append(normalise_glyph(canvas[rows.min():rows.max() + 1, columns.min():columns.max() + 1]))
+    return flatten_glyphs(glyphs)
+
+_glyph_templates = {}
+
+def load_glyph_templates(template_path=GLYPH_TEMPLATE_PATH):
+    """
+    Load the calibrated 0-9 glyph templates, once per path.
+
+    :return: Array of shape (10, GLYPH_HEIGHT * GLYPH_WIDTH), or None when
+        no glyph set was calibrated at template_path
+    """
+    import numpy as np
+
+    if template_path not in _glyph_templates:
+        if template_path and os.path.exists(template_path):
+            _glyph_templates[template_path] = np.load(template_path)['templates']
+        else:
+            print(f"No calibrated glyph set at {template_path}, reading every gauge with Tesseract. "
+                  f"Run the calibrate command on reports with embedded Lighthouse JSON to create it.")
+            _glyph_templates[template_path] = None
+    return _glyph_templates[template_path]
+
+def save_glyph_templates(crops, scores, template_path=GLYPH_TEMPLATE_PATH):
+    """
+    Calibrate the glyph set from gauges whose scores are known, e.g. from the embedded LHR.
+
+    :param crops: Thresholded gauge crops
+    :param scores: The true score of each crop
+    :param template_path: Where to save the .npz glyph set
+    """
+    import numpy as np
+
+    samples = {digit: [] for digit in range(10)}
+    for crop, score in zip(crops, scores):
+        glyphs = segment_digits(crop)
+        if score is None or len(glyphs) != len(str(score)):
+            continue
+        for digit, glyph in zip(str(score), glyphs):
+            samples[int(digit)].append(glyph)
+
+    missing = [digit for digit, glyphs in samples.items() if not glyphs]
+    if missing:
+        raise ValueError(f"No calibration samples for digits: {missing}")
+
+    templates = flatten_glyphs([np.mean(samples[digit], axis=0) for digit in range(10)])
+    os.makedirs(os.path.dirname(template_path), exist_ok=True)
+    np.savez_compressed(template_path, templates=templates)
+    _glyph_templates.pop(template_path, None)
+    print(f"Glyph templates saved to: {template_path}")
+
+def classify_gauges(crops, templates=None):
+    """
+    Read gauge scores by matching their digits against the glyph templates.
+
+    The digits of all crops are matched in a single matrix product.
+
+    :param crops: Thresholded gauge crops
+    :param templates: Glyph templates, defaults to the calibrated set and
+        then to render_glyph_templates()
+    :return: (scores, confidences); a gauge's confidence is its weakest digit
+        correlation, 0 when no usable digits were found
+    """
+    if templates is None:
+        templates = load_glyph_templates()
+    if templates is None:
+        templates = render_glyph_templates()
+
+    segmented = [segment_digits(crop) for crop in crops]
+    glyphs = [glyph for digits in segmented for glyph in digits]
+    if not glyphs:
+        return [None] * len(crops), [0.0] * len(crops)
+
+    correlations = flatten_glyphs(glyphs) @ templates.T
+    digits = correlations.argmax(axis=1)
+    digit_confidences = correlations.max(axis=1)
+
+    scores, confidences = [], []
+    position = 0
+    for digits_in_crop in segmented:
+        digit_count = len(digits_in_crop)
+        number = None
+        if 1 <= digit_count <= 3:
+            number = int(''.join(str(d) for d in digits[position:position + digit_count]))
+        if number is None or number > 100:
+            scores.append(None)
+            confidences.append(0.0)
+        else:
+            scores.append(number)
+            confidences.append(float(digit_confidences[position:position + digit_count].min()))
+        position += digit_count
+    return scores, confidences
+
+def recognize_gauges(crops, tess_api=None, ocr_engine='tesseract', template_path=GLYPH_TEMPLATE_PATH):
+    """
+    Read the score of every thresholded gauge crop.
+
+    With ocr_engine='template' the digits are matched against the calibrated
+    glyph set first and only gauges below GLYPH_MIN_CONFIDENCE go to Tesseract;
+    without a calibrated set every gauge goes to Tesseract. Without a
+    long-lived tesserocr engine those are read in one batched Tesseract call
+    instead of starting a process per gauge.
+    """
+    numbers = [None] * len(crops)
+    pending = list(range(len(crops)))
+
+    templates = load_glyph_templates(template_path) if ocr_engine == 'template' else None
+    if templates is not None:
+        count('template_reads', len(crops))
+        scores, confidences = classify_gauges(crops, templates)
+        pending = [i for i, confidence in enumerate(confidences) if confidence < GLYPH_MIN_CONFIDENCE]
+        for i, score in enumerate(scores):
+            numbers[i] = score
+        if pending:
+            print(f"{len(pending)} of {len(crops)} gauges below template confidence, using Tesseract")
+    elif ocr_engine not in ('tesseract', 'template'):
+        raise ValueError(f"Unknown OCR engine: {ocr_engine}")
+
+    fallback_crops = [crops[i] for i in pending]
+    if tess_api is None:
+        # One Tesseract process for the whole batch
+        count('ocr_calls', 1 if fallback_crops else 0)
+        fallback_numbers = recognize_gauges_batched(fallback_crops)
+    else:
+        count('ocr_calls', len(fallback_crops))
+        # Run OCR on each preprocessed circle region
+        fallback_numbers = [parse_gauge_text(ocr_digits(crop, tess_api)) for crop in fallback_crops]
+    for i, number in zip(pending, fallback_numbers):
+        numbers[i] = number
+    return numbers
+
+def locate_gauges_from_dom(driver, image):
+    """
+    Crop every score gauge using its bounding box in the rendered report.
+
+    :param driver: Selenium driver showing the report
+    :param image: Screenshot of the viewport as a BGR array
+    :return: Dict of metric label to thresholded gauge crop, empty if the report has no gauges
+    """
+    height, width = image.shape[:2]
+    crops = {}
+    # One script call returns the label and box of every gauge instead of several round trips each
+    for gauge in driver.execute_script(GAUGE_GEOMETRY_SCRIPT):
+        label = GAUGE_LABELS.get(gauge['label'].strip().lower())
+        if label is None or label in crops:
+            continue
+
+        rect = gauge['rect']
+        left = max(0, int(rect['x']))
+        top = max(0, int(rect['y']))
+        right = min(int(rect['x'] + rect['width']), width)
+        bottom = min(int(rect['y'] + rect['height']), height)
+        if right > left and bottom > top:
+            crops[label] = threshold_gauge(image[top:bottom, left:right])
+    return crops
+
+@functools.lru_cache(maxsize=None)
+def resolve_chromedriver_path():
+    """
+    Resolve the ChromeDriver binary once per process.
+
+    CHROMEDRIVER_PATH skips the lookup entirely, which keeps runs offline;
+    otherwise webdriver_manager downloads or finds the matching driver.
+    """
+    driver_path = os.environ.get('CHROMEDRIVER_PATH')
+    if driver_path:
+        return driver_path
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    return ChromeDriverManager().install()
+
+def setup_selenium(timeout=REPORT_TIME_BUDGET):
+    """
+    Set up Selenium WebDriver with automatic ChromeDriver management.
+
+    :param timeout: Seconds after which a page load or script call is abandoned,
+        so a report that hangs the browser fails instead of blocking its worker
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
 
-def setup_selenium():
-    """Set up Selenium WebDriver with automatic ChromeDriver management"""
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     
-    # Automatically download and configure ChromeDriver
-    service = Service(ChromeDriverManager().install())
+    # Automatically download and configure ChromeDriver, only on the first call
+    service = Service(resolve_chromedriver_path())
     driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver.set_page_load_timeout(timeout)
+    driver.set_script_timeout(timeout)
     return driver
 
-def take_screenshot_and_ocr(driver, file_path, output_dir):
-    """Take a screenshot of the page and perform OCR on the lh-scores__container"""
-    driver.get(f"file://{os.path.abspath(file_path)}")
-    
-    # Wait for the page to load
-    time.sleep(2)
+def decode_png(png_bytes):
+    """Decode PNG bytes straight into a BGR NumPy array without touching the disk."""
+    import cv2
+    import numpy as np
+
+    return cv2.imdecode(np.frombuffer(png_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+def wait_for_report(driver, timeout=REPORT_TIME_BUDGET):
+    """Wait until the report has rendered every score gauge, raising TimeoutException otherwise"""
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+        lambda driver: driver.execute_script(REPORT_READY_SCRIPT)
+    )
+
+def capture_gauges(driver, file_path, output_dir, timeout=REPORT_TIME_BUDGET):
+    """
+    Load a report in the browser and crop its score gauges, without reading them yet.
+
+    Errors are raised rather than swallowed, so the caller can retry the
+    report and restart the browser if it is what failed.
+
+    :param driver: Selenium driver the report is loaded in
+    :param file_path: Path to the HTML report
+    :param output_dir: Directory the per-report JSON file is written to later
+    :param timeout: Seconds the report may take in the browser; TimeoutError
+        is raised once a step finishes past it. OCR is not part of it
+    :return: Dict with the file_path, output_dir, the thresholded crops and
+        their labels, None when the gauges were found by a circle search
+    """
+    from selenium.webdriver.common.by import By
+
+    deadline = time.monotonic() + timeout
+
+    def check_budget(step):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{step} exceeded the {timeout}s budget of the report")
+
+    with timed_stage('page_load'):
+        driver.get(f"file://{os.path.abspath(file_path)}")
+        # Wait for the gauges instead of sleeping a fixed time, within what is left of the budget
+        wait_for_report(driver, max(deadline - time.monotonic(), 0))
+
+    # Take a screenshot of the entire page, kept in memory as a BGR array
+    with timed_stage('screenshot'):
+        image = decode_png(driver.get_screenshot_as_png())
+
+    # Crop each gauge at its DOM position so every score keeps its label
+    with timed_stage('dom_gauges'):
+        gauge_crops = locate_gauges_from_dom(driver, image)
+    check_budget('Rendering')
+    capture = {"file_path": file_path, "output_dir": output_dir}
+    if gauge_crops:
+        capture.update(labels=list(gauge_crops), crops=list(gauge_crops.values()))
+        return capture
+
+    # Older reports without gauge wrappers: search the container for circles
+    lh_scores_container = driver.find_element(By.CSS_SELECTOR, '.lh-scores-container')
     
-    # Take a screenshot of the entire page
-    screenshot_path = os.path.join(output_dir, "screenshot.png")
-    driver.save_screenshot(screenshot_path)
+    # Get the location and size of the element
+    location = lh_scores_container.location
+    size = lh_scores_container.size
     
-    # Locate the lh-scores__container element
-    try:
-        lh_scores_container = driver.find_element(By.CSS_SELECTOR, '.lh-scores-container')
-        
-        # Get the location and size of the element
-        location = lh_scores_container.location
-        size = lh_scores_container.size
-        
-        # Crop the screenshot to the lh-scores__container element
-        image = Image.open(screenshot_path)
-        left = max(0, location['x'])
-        top = max(0, location['y'])
-        right = min(location['x'] + size['width'], image.width)
-        bottom = min(location['y'] + size['height'], image.height)
-
-        # Crop with corrected coordinates
-        cropped_image = image.crop((left, top, right, bottom))
-        cropped_image_path = os.path.join(output_dir, "cropped_screenshot.png")
-        cropped_image.save(cropped_image_path)
-        
-        # Perform OCR on the cropped image
-        ocr_text = pytesseract.image_to_string(cropped_image)
-        print("OCR Text from lh-scores__container:")
-        # print(ocr_text)
-
-        # Extract and print numerical values
-        image_cv = cv2.imread(cropped_image_path)
-        extracted_numbers = extract_numbers_from_circles(image_cv)
-        print(extracted_numbers)
+    # Crop the screenshot to the lh-scores__container element
+    height, width = image.shape[:2]
+    left = max(0, int(location['x']))
+    top = max(0, int(location['y']))
+    right = min(int(location['x'] + size['width']), width)
+    bottom = min(int(location['y'] + size['height']), height)
+
+    # Crop with corrected coordinates; slicing is a view, not a copy
+    with timed_stage('hough_circles'):
+        crops = locate_gauge_crops(image[top:bottom, left:right])
+    count('circles_found', len(crops))
+    check_budget('Circle search')
+    capture.update(labels=None, crops=crops)
+    return capture
+
+def read_gauge_batch(captures, tess_api=None, ocr_engine='tesseract'):
+    """
+    Read the gauges of one or more captured reports together and save each report's scores.
 
+    The crops of all reports go through a single recognize_gauges call, so
+    without tesserocr one Tesseract process reads the gauges of a whole batch.
+
+    :param captures: Dicts returned by capture_gauges
+    :param tess_api: Optional long-lived tesserocr engine
+    :param ocr_engine: 'tesseract' or 'template', see recognize_gauges
+    :return: The saved JSON data of every report, in the same order
+    """
+    crops = [crop for capture in captures for crop in capture['crops']]
+    with timed_stage('ocr'):
+        numbers = recognize_gauges(crops, tess_api, ocr_engine)
+
+    results = []
+    position = 0
+    for capture in captures:
+        values = numbers[position:position + len(capture['crops'])]
+        position += len(capture['crops'])
+        if capture['labels'] is not None:
+            scores = dict(zip(capture['labels'], values))
+            print(scores)
+            json_data = {
+                "extracted_numbers": [scores.get(label) for label in METRIC_LABELS],
+                "scores": scores,
+                "source": "ocr",
+            }
+        else:
+            # Circles come back in arbitrary order, so these scores are unlabelled
+            print(values)
+            json_data = {
+                "extracted_numbers": values,
+                "source": "ocr",
+            }
         # Save extracted numbers to JSON file
-        json_data = {
-            "extracted_numbers": extracted_numbers
-        }
+        save_extracted_numbers(capture['file_path'], capture['output_dir'], json_data)
+        results.append(json_data)
+    return results
 
-        # Use the original HTML filename (without extension) as the JSON filename
-        json_filename = os.path.splitext(os.path.basename(file_path))[0] + '.json'
-        json_path = os.path.join(output_dir, json_filename)
-
-        # Save the JSON data
-        with open(json_path, 'w') as json_file:
-            json.dump(json_data, json_file, indent=4)
-        print(f"Extracted numbers saved to: {json_path}")
-        
-    except Exception as e:
-        print(f"Error during screenshot or OCR: {str(e)}")
-
-def create_plots(json_data, output_dir):
-    """Create plots for the metrics"""
-    import matplotlib.pyplot as plt
+def take_screenshot_and_ocr(driver, file_path, output_dir, tess_api=None, ocr_engine='tesseract',
+                            timeout=REPORT_TIME_BUDGET):
+    """
+    Take a screenshot of a single report and read its scores with OCR.
+
+    :param timeout: Seconds the report may take in the browser, see capture_gauges
+    :return: The saved JSON data
+    """
+    capture = capture_gauges(driver, file_path, output_dir, timeout)
+    return read_gauge_batch([capture], tess_api, ocr_engine)[0]
+
+def calibrate_glyph_templates(directory='Reports', template_path=GLYPH_TEMPLATE_PATH, limit=200, holdout=0.25):
+    """
+    Build the glyph set from the gauges of real reports, checked against their embedded Lighthouse JSON.
+
+    HTML reports that embed their Lighthouse result are rendered and their
+    gauges cropped exactly as OCR extraction does, while the score each
+    gauge shows is read from the result. A share of the reports is kept
+    aside; the accuracy of the new glyph set on their gauges is printed and
+    saved next to the templates as JSON.
+
+    :param directory: Directory searched for HTML reports
+    :param template_path: Where to save the .npz glyph set
+    :param limit: Most reports rendered
+    :param holdout: Share of reports kept aside to measure the accuracy
+    :return: Dict with the gauge counts and the accuracy on the held-out gauges
+    """
+    paths = sorted(
+        os.path.join(root, filename)
+        for root, dirs, files in os.walk(directory)
+        for filename in files if filename.endswith('.html')
+    )
+
+    # Labelled (crop, score) pairs of each report
+    reports = []
+    driver = setup_selenium()
+    try:
+        for path in paths:
+            if len(reports) >= limit:
+                break
+            lhr = load_lhr(path)
+            if lhr is None:
+                continue
+            scores = extract_scores_from_lhr(lhr)
+            try:
+                capture = capture_gauges(driver, path, None)
+            except Exception as e:
+                message = str(e).strip().split('\n', 1)[0]
+                print(f"Skipping {path}: {type(e).__name__}: {message}")
+                continue
+            if capture['labels'] is None:
+                continue
+            reports.append([
+                (crop, scores[label]) for label, crop in zip(capture['labels'], capture['crops'])
+                if scores.get(label) is not None
+            ])
+    finally:
+        driver.quit()
+    if not reports:
+        raise ValueError(f"No HTML reports with embedded Lighthouse JSON and score gauges in {directory}")
+
+    # Every n-th report is held out, so no gauge of a report is both learnt and measured
+    step = max(2, round(1 / holdout)) if holdout > 0 else None
+    train = [sample for index, samples in enumerate(reports)
+             if step is None or index % step != step - 1 for sample in samples]
+    test = [sample for index, samples in enumerate(reports)
+            if step is not None and index % step == step - 1 for sample in samples]
+    save_glyph_templates([crop for crop, _ in train], [score for _, score in train], template_path)
+
+    result = {
+        "calibrated_at": datetime.now(timezone.utc).isoformat(),
+        "reports": len(reports),
+        "train_gauges": len(train),
+        "test_gauges": len(test),
+    }
+    if test:
+        predicted, confidences = classify_gauges([crop for crop, _ in test], load_glyph_templates(template_path))
+        confident = [confidence >= GLYPH_MIN_CONFIDENCE for confidence in confidences]
+        correct = [score == truth for score, (_, truth) in zip(predicted, test)]
+        answered = sum(confident)
+        result.update(
+            accuracy=sum(correct) / len(test),
+            # Share of gauges the templates answer without Tesseract, and how often those are right
+            template_share=answered / len(test),
+            template_accuracy=sum(c for c, k in zip(correct, confident) if k) / answered if answered else None,
+        )
+        print(f"Held-out gauges: {len(test)}, accuracy {result['accuracy']:.3f}, "
+              f"{result['template_share']:.1%} answered by templates")
+
+    with open(os.path.splitext(template_path)[0] + '.json', 'w') as accuracy_file:
+        json.dump(result, accuracy_file, indent=4)
+    return result
+
+def draw_device_bars(fig, data):
+    """Grouped bars of each metric per device for one page and mode."""
     import numpy as np
-    
-    # Metric labels
-    metric_labels = ['SEO', 'Best Practice', 'Accessibility', 'Performance']
-    
-    for category in json_data:
-        category_name = list(category.keys())[0]
-        subcategories = list(category.values())[0]
-        
-        for subcategory in subcategories:
-            subcategory_name = list(subcategory.keys())[0]
-            modes = list(subcategory.values())[0]
-            
-            for mode in modes:
-                mode_name = list(mode.keys())[0]
-                devices = list(mode.values())[0]
-                
-                # Prepare data for plotting
-                device_data = {}
-                for device in devices:
-                    device_name = list(device.keys())[0]
-                    values = list(device.values())[0]
-                    # Ensure we only take the first 4 values
-                    device_data[device_name] = values[:4]
-                
-                # Create plot
-                fig, ax = plt.subplots(figsize=(10, 6))
-                
-                # Set up the bar positions
-                bar_width = 0.2
-                index = np.arange(len(metric_labels))
-                
-                # Plot bars for each device
-                for i, (device, values) in enumerate(device_data.items()):
-                    ax.bar(index + i * bar_width, values, bar_width, label=device)
-                
-                # Add labels, title and custom x-axis tick labels
-                ax.set_xlabel('Metrics')
-                ax.set_ylabel('Scores')
-                ax.set_title(f'{category_name} - {subcategory_name} - {mode_name}')
-                ax.set_xticks(index + bar_width * (len(device_data) - 1) / 2)
-                ax.set_xticklabels(metric_labels)
-                
-                # Move legend to top left
-                ax.legend(loc='upper left', bbox_to_anchor=(0, 1))
-                
-                # Save the plot
-                plot_filename = f"{category_name}_{subcategory_name}_{mode_name}.png"
-                plot_path = os.path.join(output_dir, plot_filename)
-                plt.savefig(plot_path, bbox_inches='tight', dpi=300)
-                plt.close()
-                
-                print(f"Plot saved to: {plot_path}")
 
-def create_comparison_plots(json_data, output_dir):
-    """Create comparison plots between different modes, pages, subcategories, and categories"""
-    import matplotlib.pyplot as plt
+    metric_labels = METRIC_LABELS
+    ax = fig.subplots()
+
+    # Set up the bar positions
+    bar_width = 0.2
+    index = np.arange(len(metric_labels))
+
+    # Plot bars for each device
+    for i, (device, values) in enumerate(data['devices'].items()):
+        ax.bar(index + i * bar_width, values, bar_width, label=device)
+
+    # Add labels, title and custom x-axis tick labels
+    ax.set_xlabel('Metrics')
+    ax.set_ylabel('Scores')
+    ax.set_title(data['title'])
+    ax.set_xticks(index + bar_width * (len(data['devices']) - 1) / 2)
+    ax.set_xticklabels(metric_labels)
+
+    # Move legend to top left
+    ax.legend(loc='upper left', bbox_to_anchor=(0, 1))
+
+def draw_average_bars(fig, data):
+    """Bars of the average score of each metric, labelled with their value."""
     import numpy as np
-    
-    # Metric labels
-    metric_labels = ['SEO', 'Best Practice', 'Accessibility', 'Performance']
-    
-    # Create a dictionary to store all data for comparison
+
+    metric_labels = METRIC_LABELS
+    ax = fig.subplots()
+
+    # Create bar plot
+    index = np.arange(len(metric_labels))
+    ax.bar(index, data['values'], width=0.6)
+
+    # Add labels and title
+    ax.set_xlabel('Metrics')
+    ax.set_ylabel('Average Score')
+    ax.set_title(data['title'])
+    ax.set_xticks(index)
+    ax.set_xticklabels(metric_labels)
+
+    # Add value labels on top of bars
+    for i, v in enumerate(data['values']):
+        if not np.isnan(v):
+            ax.text(i, v + 1, f"{v:.1f}", ha='center')
+
+def draw_summary(fig, data):
+    """One line chart of average scores per comparison in a 2x2 grid."""
+    metric_labels = METRIC_LABELS
+    axes = fig.subplots(2, 2)
+    fig.suptitle('Comprehensive Metrics Summary', fontsize=16, y=1.02)
+
+    # One panel per comparison: categories, subcategories, modes, devices
+    for ax, (title, lines) in zip(axes.flat, data['panels'].items()):
+        for name, values in lines.items():
+            ax.plot(metric_labels, values, marker='o', label=name)
+        ax.set_title(f'{title} Comparison')
+        ax.set_ylabel('Average Score')
+        ax.legend(loc='upper left')
+        ax.grid(True)
+    fig.tight_layout()
+
+# Figure kinds: drawing function and figure size in inches
+FIGURE_DRAWERS = {
+    'device_bars': (draw_device_bars, (10, 6)),
+    'average_bars': (draw_average_bars, (12, 6)),
+    'summary': (draw_summary, (20, 16)),
+}
+
+def render_figure(job):
+    """
+    Draw and save one figure; runs in a worker process.
+
+    An explicit Figure is used instead of pyplot, so no global state is shared
+    and the canvas (Agg, SVG, ...) is chosen from the file format.
+
+    :param job: (kind, plot path, data, dpi) tuple
+    :return: The plot path
+    """
+    from matplotlib.figure import Figure
+
+    kind, plot_path, data, dpi = job
+    draw, figsize = FIGURE_DRAWERS[kind]
+    fig = Figure(figsize=figsize)
+    draw(fig, data)
+    fig.savefig(plot_path, bbox_inches='tight', dpi=dpi)
+    return plot_path
+
+@timed('plots')
+def render_figures(figures, output_dir, dpi=300, fmt='png', workers=None, incremental=True):
+    """
+    Render figures in a process pool, skipping those whose input has not changed.
+
+    :param figures: List of (kind, file name without extension, data) tuples; data must be picklable
+    :param output_dir: Directory the figures are saved to
+    :param dpi: Resolution of raster formats
+    :param fmt: Any format matplotlib can save, e.g. 'png' or 'svg'
+    :param workers: Number of processes, defaults to the CPU count; 1 renders in this process
+    :param incremental: Skip figures whose data, DPI and format match the last render
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, PLOT_MANIFEST)
+    manifest = load_manifest(manifest_path) if incremental else {}
+
+    jobs = []
+    for kind, name, data in figures:
+        plot_filename = f"{name}.{fmt}"
+        plot_path = os.path.join(output_dir, plot_filename)
+        fingerprint = hashlib.sha256(
+            json.dumps([kind, data, dpi], sort_keys=True, default=str).encode()
+        ).hexdigest()
+        if manifest.get(plot_filename) == fingerprint and os.path.exists(plot_path):
+            continue
+        manifest[plot_filename] = fingerprint
+        jobs.append((kind, plot_path, data, dpi))
+
+    print(f"Rendering {len(jobs)} of {len(figures)} figures")
+    count('figures_rendered', len(jobs))
+    count('figures_skipped', len(figures) - len(jobs))
+    if workers == 1 or len(jobs) <= 1:
+        rendered = map(render_figure, jobs)
+        for plot_path in rendered:
+            print(f"Plot saved to: {plot_path}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for plot_path in executor.map(render_figure, jobs, chunksize=max(1, len(jobs) // 64)):
+                print(f"Plot saved to: {plot_path}")
+
+    save_manifest(manifest_path, manifest)
+
+def plot_values(values):
+    """Convert a row of scores to plain floats so figure data pickles and hashes cheaply."""
+    return [float(v) for v in values]
+
+def create_plots(metrics, output_dir, **render_options):
+    """
+    Create a bar chart of every page and mode, one bar group per device.
+
+    :param render_options: dpi, fmt, workers and incremental, see render_figures
+    """
+    frame = latest_run(load_metrics_frame(metrics))
+
+    figures = []
+    for (category_name, subcategory_name, mode_name), group in frame.groupby(
+        ['category', 'page', 'mode'], observed=True
+    ):
+        # Prepare data for plotting: one row of scores per device
+        device_data = (
+            group.set_index(['device', 'metric'])['score']
+            .unstack('metric')
+            .reindex(columns=METRIC_LABELS)
+        )
+        figures.append(('device_bars', f"{category_name}_{subcategory_name}_{mode_name}", {
+            'title': f'{category_name} - {subcategory_name} - {mode_name}',
+            'devices': {str(device): plot_values(values) for device, values in device_data.iterrows()},
+        }))
+
+    render_figures(figures, output_dir, **render_options)
+
+def create_comparison_plots(metrics, output_dir, **render_options):
+    """
+    Create comparison plots between different modes, pages, subcategories, and categories
+
+    :param render_options: dpi, fmt, workers and incremental, see render_figures
+    """
+    frame = latest_run(load_metrics_frame(metrics))
+
+    # Average scores for each comparison; subcategory and device identify a page
     comparison_data = {
-        'modes': {},
-        'pages': {},
-        'subcategories': {},
-        'categories': {}
+        'modes': metric_table(frame, ['mode']),
+        'pages': metric_table(frame, ['page', 'device']),
+        'subcategories': metric_table(frame, ['page']),
+        'categories': metric_table(frame, ['category']),
     }
-    
-    # Collect data for comparisons
-    for category in json_data:
-        category_name = list(category.keys())[0]
-        subcategories = list(category.values())[0]
-        
-        # Initialize category data
-        if category_name not in comparison_data['categories']:
-            comparison_data['categories'][category_name] = {m: [] for m in metric_labels}
-        
-        for subcategory in subcategories:
-            subcategory_name = list(subcategory.keys())[0]
-            modes = list(subcategory.values())[0]
-            
-            # Initialize subcategory data
-            if subcategory_name not in comparison_data['subcategories']:
-                comparison_data['subcategories'][subcategory_name] = {m: [] for m in metric_labels}
-            
-            for mode in modes:
-                mode_name = list(mode.keys())[0]
-                devices = list(mode.values())[0]
-                
-                # Initialize mode data
-                if mode_name not in comparison_data['modes']:
-                    comparison_data['modes'][mode_name] = {m: [] for m in metric_labels}
-                
-                for device in devices:
-                    device_name = list(device.keys())[0]
-                    values = list(device.values())[0][:4]
-                    
-                    # Add data to all comparison categories
-                    for i, metric in enumerate(metric_labels):
-                        comparison_data['modes'][mode_name][metric].append(values[i])
-                        comparison_data['subcategories'][subcategory_name][metric].append(values[i])
-                        comparison_data['categories'][category_name][metric].append(values[i])
-                        
-                        # Use subcategory as page identifier
-                        page_key = f"{subcategory_name}_{device_name}"
-                        if page_key not in comparison_data['pages']:
-                            comparison_data['pages'][page_key] = {m: [] for m in metric_labels}
-                        comparison_data['pages'][page_key][metric].append(values[i])
-    
-    # Create comparison plots
+
+    figures = []
     for comparison_type, data in comparison_data.items():
-        for name, metrics in data.items():
-            # Create plot
-            fig, ax = plt.subplots(figsize=(12, 6))
-            
-            # Calculate average values for each metric
-            avg_values = [np.mean(metrics[m]) for m in metric_labels]
-            
-            # Create bar plot
-            index = np.arange(len(metric_labels))
-            ax.bar(index, avg_values, width=0.6)
-            
-            # Add labels and title
-            ax.set_xlabel('Metrics')
-            ax.set_ylabel('Average Score')
-            ax.set_title(f'Comparison of {comparison_type.capitalize()}: {name}')
-            ax.set_xticks(index)
-            ax.set_xticklabels(metric_labels)
-            
-            # Add value labels on top of bars
-            for i, v in enumerate(avg_values):
-                ax.text(i, v + 1, f"{v:.1f}", ha='center')
-            
-            # Save the plot
-            plot_filename = f"comparison_{comparison_type}_{name}.png".replace(" ", "_").replace("/", "_")
-            plot_path = os.path.join(output_dir, plot_filename)
-            plt.savefig(plot_path, bbox_inches='tight', dpi=300)
-            plt.close()
-            
-            print(f"Comparison plot saved to: {plot_path}")
-
-def create_summary_plot(json_data, output_dir):
-    """Create a single summary plot with all metrics and comparisons"""
-    import matplotlib.pyplot as plt
-    import numpy as np
-    
-    # Metric labels
-    metric_labels = ['SEO', 'Best Practice', 'Accessibility', 'Performance']
-    
+        for name, avg_values in data.iterrows():
+            if isinstance(name, tuple):
+                name = '_'.join(str(part) for part in name)
+            plot_name = f"comparison_{comparison_type}_{name}".replace(" ", "_").replace("/", "_")
+            figures.append(('average_bars', plot_name, {
+                'title': f'Comparison of {comparison_type.capitalize()}: {name}',
+                'values': plot_values(avg_values),
+            }))
+
+    render_figures(figures, output_dir, **render_options)
+
+def create_summary_plot(metrics, output_dir, **render_options):
+    """
+    Create a single summary plot with all metrics and comparisons
+
+    :param render_options: dpi, fmt, workers and incremental, see render_figures
+    """
+    frame = latest_run(load_metrics_frame(metrics))
+
     # Prepare data for the summary plot
     summary_data = {
-        'categories': {},
-        'subcategories': {},
-        'modes': {},
-        'devices': {}
+        'Categories': metric_table(frame, ['category']),
+        'Subcategories': metric_table(frame, ['page']),
+        'Modes': metric_table(frame, ['mode']),
+        'Devices': metric_table(frame, ['device']),
+    }
+    panels = {
+        title: {str(name): plot_values(values) for name, values in data.iterrows()}
+        for title, data in summary_data.items()
     }
-    
-    # Collect data for the summary plot
-    for category in json_data:
-        category_name = list(category.keys())[0]
-        subcategories = list(category.values())[0]
-        
-        # Initialize category data
-        if category_name not in summary_data['categories']:
-            summary_data['categories'][category_name] = {m: [] for m in metric_labels}
-        
-        for subcategory in subcategories:
-            subcategory_name = list(subcategory.keys())[0]
-            modes = list(subcategory.values())[0]
-            
-            # Initialize subcategory data
-            if subcategory_name not in summary_data['subcategories']:
-                summary_data['subcategories'][subcategory_name] = {m: [] for m in metric_labels}
-            
-            for mode in modes:
-                mode_name = list(mode.keys())[0]
-                devices = list(mode.values())[0]
-                
-                # Initialize mode data
-                if mode_name not in summary_data['modes']:
-                    summary_data['modes'][mode_name] = {m: [] for m in metric_labels}
-                
-                for device in devices:
-                    device_name = list(device.keys())[0]
-                    values = list(device.values())[0][:4]
-                    
-                    # Add data to all summary categories
-                    for i, metric in enumerate(metric_labels):
-                        summary_data['categories'][category_name][metric].append(values[i])
-                        summary_data['subcategories'][subcategory_name][metric].append(values[i])
-                        summary_data['modes'][mode_name][metric].append(values[i])
-                        
-                        # Initialize device data
-                        if device_name not in summary_data['devices']:
-                            summary_data['devices'][device_name] = {m: [] for m in metric_labels}
-                        summary_data['devices'][device_name][metric].append(values[i])
-    
-    # Create the summary plot
-    fig, axes = plt.subplots(2, 2, figsize=(20, 16))
-    fig.suptitle('Comprehensive Metrics Summary', fontsize=16, y=1.02)
-    
-    # Plot 1: Categories Comparison
-    ax1 = axes[0, 0]
-    for category, metrics in summary_data['categories'].items():
-        avg_values = [np.mean(metrics[m]) for m in metric_labels]
-        ax1.plot(metric_labels, avg_values, marker='o', label=category)
-    ax1.set_title('Categories Comparison')
-    ax1.set_ylabel('Average Score')
-    ax1.legend(loc='upper left')
-    ax1.grid(True)
-    
-    # Plot 2: Subcategories Comparison
-    ax2 = axes[0, 1]
-    for subcategory, metrics in summary_data['subcategories'].items():
-        avg_values = [np.mean(metrics[m]) for m in metric_labels]
-        ax2.plot(metric_labels, avg_values, marker='o', label=subcategory)
-    ax2.set_title('Subcategories Comparison')
-    ax2.set_ylabel('Average Score')
-    ax2.legend(loc='upper left')
-    ax2.grid(True)
-    
-    # Plot 3: Modes Comparison
-    ax3 = axes[1, 0]
-    for mode, metrics in summary_data['modes'].items():
-        avg_values = [np.mean(metrics[m]) for m in metric_labels]
-        ax3.plot(metric_labels, avg_values, marker='o', label=mode)
-    ax3.set_title('Modes Comparison')
-    ax3.set_ylabel('Average Score')
-    ax3.legend(loc='upper left')
-    ax3.grid(True)
-    
-    # Plot 4: Devices Comparison
-    ax4 = axes[1, 1]
-    for device, metrics in summary_data['devices'].items():
-        avg_values = [np.mean(metrics[m]) for m in metric_labels]
-        ax4.plot(metric_labels, avg_values, marker='o', label=device)
-    ax4.set_title('Devices Comparison')
-    ax4.set_ylabel('Average Score')
-    ax4.legend(loc='upper left')
-    ax4.grid(True)
-    
-    # Adjust layout and save the plot
-    plt.tight_layout()
-    plot_path = os.path.join(output_dir, 'summary_plot.png')
-    plt.savefig(plot_path, bbox_inches='tight', dpi=300)
-    plt.close()
-    
-    print(f"Summary plot saved to: {plot_path}")
 
-def process_reports_directory(directory='Reports', output_dir='Metrics'):
-    """Process all HTML files using Selenium"""
-    driver = setup_selenium()
-    
-    # try:
-    #     if not os.path.exists(directory):
-    #         print(f"Directory '{directory}' not found!")
-    #         return
-
-    #     for root, dirs, files in os.walk(directory):
-    #         for filename in files:
-    #             if filename.endswith('.html'):
-    #                 file_path = os.path.join(root, filename)
-    #                 try:                        
-    #                     # Create corresponding output path
-    #                     relative_path = os.path.relpath(root, directory)
-    #                     output_path = os.path.join(output_dir, relative_path, f"{os.path.splitext(filename)[0]}.json")
-                        
-    #                     # Save metrics
-    #                     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                        
-    #                     # Take screenshot and perform OCR
-    #                     take_screenshot_and_ocr(driver, file_path, os.path.dirname(output_path))
-                        
-    #                 except Exception as e:
-    #                     print(f"Error processing {filename}: {str(e)}")
-    merge_json_files(output_dir)
-    # finally:
-    #     driver.quit()
+    render_figures([('summary', 'summary_plot', {'panels': panels})], output_dir, **render_options)
+
+def extraction_worker(jobs, parser, worker_id=0, results=None, ocr_engine='tesseract',
+                      timeout=REPORT_TIME_BUDGET, retries=REPORT_RETRIES, failures=None):
+    """
+    Extract reports from a shared queue until it is empty.
+
+    Each worker owns one Chrome driver and one Tesseract engine for its whole
+    lifetime; the driver is only started once a report actually needs OCR.
+    The gauges of reports that need OCR are collected across reports and read
+    together once OCR_BATCH_GAUGES are waiting, or when the queue runs dry.
+    A report that fails is put back at the end of the queue, up to retries
+    times. When the browser is what failed, the driver is discarded and a
+    fresh one is started for the next report that needs it.
+
+    :param jobs: Queue of (report path, output directory, attempt) tuples
+    :param parser: 'lhr' or 'ocr', see extract_report
+    :param worker_id: Number used to tag this worker's log lines
+    :param results: Optional list the (report path, JSON data) of every extracted report is appended to
+    :param ocr_engine: 'tesseract' or 'template', see recognize_gauges
+    :param timeout: Seconds each report may take in the browser
+    :param retries: How many more times a failed report is attempted
+    :param failures: Optional list a dict per report that failed its last attempt is appended to
+    """
+    driver = None
+    # The LHR parser rarely needs OCR, so it does not pay for starting an engine up front
+    tess_api = create_tesseract_api() if parser == 'ocr' else None
+    # Captured gauges of reports waiting to be read together
+    ocr_batch = []
+
+    def get_driver():
+        nonlocal driver
+        if driver is None:
+            with timed_stage('browser_start'):
+                driver = setup_selenium(timeout)
+        return driver
+
+    def discard_driver():
+        nonlocal driver
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"[worker {worker_id}] Could not quit the browser cleanly: {str(e)}")
+        driver = None
+        count('browser_restarts')
+
+    def succeed(file_path, json_data):
+        if results is not None:
+            results.append((file_path, json_data))
+        count('reports_processed')
+
+    def fail(file_path, report_output_dir, attempt, e):
+        # Driver errors append a stack trace; the first line says what went wrong
+        message = str(e).strip().split('\n', 1)[0]
+        error = f"{type(e).__name__}: {message}"
+        print(f"[worker {worker_id}] Error processing {file_path} (attempt {attempt + 1}): {error}")
+        if driver is not None:
+            from selenium.common.exceptions import WebDriverException
+
+            # A crashed or hung browser fails every later report too, so start a new one
+            if isinstance(e, WebDriverException):
+                discard_driver()
+        if attempt < retries:
+            count('reports_retried')
+            jobs.put((file_path, report_output_dir, attempt + 1))
+        else:
+            count('reports_failed')
+            if failures is not None:
+                failures.append({"path": file_path, "attempts": attempt + 1, "error": error})
+
+    def read_batch():
+        captures = ocr_batch[:]
+        ocr_batch.clear()
+        try:
+            saved = read_gauge_batch(captures, tess_api, ocr_engine)
+        except Exception as e:
+            # One failed OCR pass sends every report of the batch back to the queue
+            for capture in captures:
+                fail(capture['file_path'], capture['output_dir'], capture['attempt'], e)
+            return
+        for capture, json_data in zip(captures, saved):
+            succeed(capture['file_path'], json_data)
+
+    try:
+        while True:
+            try:
+                file_path, report_output_dir, attempt = jobs.get_nowait()
+            except queue.Empty:
+                if not ocr_batch:
+                    return
+                # Reading the last gauges may put failed reports back on the queue
+                read_batch()
+                continue
+            try:
+                with timed_stage('extract'):
+                    json_data = extract_report(
+                        file_path, report_output_dir, parser, get_driver, tess_api, ocr_engine, timeout,
+                        ocr_batch,
+                    )
+                if json_data is None:
+                    # Unreadable .json.gz reports fail the same way every time, so they are not retried
+                    count('reports_failed')
+                    if failures is not None:
+                        failures.append({"path": file_path, "attempts": attempt + 1,
+                                         "error": "unreadable Lighthouse JSON"})
+                elif ocr_batch and json_data is ocr_batch[-1]:
+                    # Only captured so far; read once a full grid of gauges is waiting
+                    json_data['attempt'] = attempt
+                    if sum(len(capture['crops']) for capture in ocr_batch) >= OCR_BATCH_GAUGES:
+                        read_batch()
+                else:
+                    succeed(file_path, json_data)
+            except Exception as e:
+                fail(file_path, report_output_dir, attempt, e)
+    finally:
+        if driver is not None:
+            driver.quit()
+        if tess_api is not None:
+            tess_api.End()
+
+def is_report_unchanged(entry, file_path, json_path):
+    """
+    Check a report against its extraction manifest entry.
+
+    Size and mtime are compared first; the content hash is only computed when
+    they differ, and a matching hash refreshes the entry's mtime in place.
+
+    :param entry: Manifest entry of the report, or None if it was never extracted
+    :param file_path: Path to the HTML report
+    :param json_path: Path of the JSON file extracted from it
+    :return: True if the report can be skipped
+    """
+    if entry is None or not os.path.exists(json_path):
+        return False
+    size, mtime = file_signature(file_path)
+    if entry['size'] != size:
+        return False
+    if entry['mtime'] == mtime:
+        return True
+    if file_digest(file_path) != entry['sha256']:
+        return False
+    entry['mtime'] = mtime
+    return True
+
+def process_reports_directory(directory='Reports', output_dir='Metrics', parser='lhr', workers=1,
+                              incremental=True, ocr_engine='tesseract', report_timeout=REPORT_TIME_BUDGET,
+                              retries=REPORT_RETRIES):
+    """
+    Extract the scores of all reports and merge them.
+
+    When a report was saved both as HTML and as .json.gz, only the much
+    smaller JSON is read. Reports that still fail after their retries are
+    listed in extraction_errors.json and left out of the manifest, so the
+    next run tries them again. The manifest is saved every
+    EXTRACTION_MANIFEST_SAVE_INTERVAL reports, so an interrupted run only
+    repeats the reports extracted since the last save.
+
+    :param directory: Directory holding the Lighthouse HTML and .json.gz reports
+    :param output_dir: Directory the per-report JSON files are written to
+    :param parser: 'lhr' (embedded Lighthouse JSON, OCR fallback) or 'ocr'
+    :param workers: Number of concurrent workers, each with its own browser
+    :param incremental: Skip reports whose content is unchanged since they were last extracted
+    :param ocr_engine: 'tesseract', or 'template' to read gauges with the glyph classifier first
+    :param report_timeout: Seconds each report may take in the browser
+    :param retries: How many more times a report that failed is attempted
+    """
+    if not os.path.exists(directory):
+        print(f"Directory '{directory}' not found!")
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, EXTRACTION_MANIFEST)
+    manifest = load_manifest(manifest_path) if incremental else {}
+    # Entries of an older format lack fields such as timings, so those reports are extracted again
+    extracted = manifest.get('reports', {}) if manifest.get('version') == EXTRACTION_MANIFEST_VERSION else {}
+
+    # Queue every new or changed report up front so workers can pull from it as they free up
+    jobs = queue.Queue()
+    skipped = 0
+    for root, dirs, files in os.walk(directory):
+        json_reports = {report_stem(filename) for filename in files if filename.endswith('.json.gz')}
+        for filename in files:
+            if filename.endswith('.json.gz') or (filename.endswith('.html') and report_stem(filename) not in json_reports):
+                file_path = os.path.join(root, filename)
+                # Create corresponding output path
+                relative_path = os.path.relpath(root, directory)
+                report_output_dir = os.path.join(output_dir, relative_path)
+                json_path = os.path.join(report_output_dir, report_stem(filename) + '.json')
+
+                entry = extracted.get(os.path.relpath(file_path, directory))
+                if is_report_unchanged(entry, file_path, json_path):
+                    skipped += 1
+                    continue
+
+                os.makedirs(report_output_dir, exist_ok=True)
+                jobs.put((file_path, report_output_dir, 0))
+
+    print(f"Extracting {jobs.qsize()} reports ({skipped} unchanged)")
+    count('reports_unchanged', skipped)
+
+    results = []
+    failures = []
+    threads = [
+        threading.Thread(target=extraction_worker,
+                         args=(jobs, parser, worker_id, results, ocr_engine, report_timeout, retries, failures),
+                         daemon=True)
+        for worker_id in range(max(1, workers))
+    ]
+    for thread in threads:
+        thread.start()
+
+    # Record what was extracted so the next run can skip it, saving the manifest as the
+    # workers go so a crash or Ctrl+C does not throw away the reports already done
+    recorded = 0
+    finished = False
+    while not finished:
+        for thread in threads:
+            thread.join(timeout=1)
+        finished = not any(thread.is_alive() for thread in threads)
+        done = len(results)
+        if done - recorded < EXTRACTION_MANIFEST_SAVE_INTERVAL and not finished:
+            continue
+        for file_path, json_data in results[recorded:done]:
+            size, mtime = file_signature(file_path)
+            extracted[os.path.relpath(file_path, directory)] = {
+                "size": size,
+                "mtime": mtime,
+                "sha256": file_digest(file_path),
+                "extracted_numbers": json_data.get('extracted_numbers', []),
+            }
+        recorded = done
+        if results or skipped:
+            save_manifest(manifest_path, {"version": EXTRACTION_MANIFEST_VERSION, "reports": extracted})
+
+    errors_path = os.path.join(output_dir, EXTRACTION_ERRORS)
+    with open(errors_path, 'w') as errors_file:
+        json.dump({"errors": failures}, errors_file, indent=4)
+    if failures:
+        print(f"{len(failures)} reports could not be extracted, see {errors_path}")
+
+    store_path = merge_json_files(output_dir, incremental)
+
+    # After merging, export every table to one workbook in the output directory
+    # create_summary_plot(store_path, output_dir)
+    export_workbook(store_path)
+    build_dashboard(store_path)
+
+def dashboard_data(metrics):
+    """
+    Pack the scores of every run into compact JSON-ready data for the dashboard.
+
+    Runs are the `Reports/<ISO date>` folders the reports came from, labelled
+    with their start time; reports outside a run folder are grouped by the
+    UTC date they were fetched on. Within a run only the latest score of a
+    page, mode and device is kept. Dimension values are stored once, and
+    each row holds their indexes followed by the scores.
+
+    :param metrics: Metrics directory, store path or DataFrame, see load_metrics_frame
+    :return: Dict with metrics, dimensions (values and display labels per
+        dimension), rows and the generation time
+    """
+    import pandas as pd
+
+    frame = load_metrics_frame(metrics)
+    in_folder = frame['run'].notna() & frame['run_timestamp'].notna()
+    run = frame['run'].astype(object).where(in_folder, frame['run_timestamp'].dt.strftime('%Y-%m-%d')).fillna('Unknown')
+    run_labels = dict(zip(run, frame['run_timestamp'].dt.strftime('%Y-%m-%d %H:%M').where(in_folder, run)))
+    frame = frame.assign(run=run)
+    wide = (
+        frame.sort_values('run_timestamp', kind='stable', na_position='first')
+        .drop_duplicates(['run'] + METRICS_KEY + ['metric'], keep='last')
+        .set_index(['run'] + METRICS_KEY + ['metric'])['score']
+        .unstack('metric')
+        .reindex(columns=METRIC_LABELS)
+        .reset_index()
+    )
+
+    dimensions, codes = {}, []
+    for name in ['run'] + METRICS_KEY:
+        values = wide[name].astype(str)
+        # Undated runs come first so the last run is always the latest
+        unique = sorted(values.unique(), key=lambda value: (value != 'Unknown', value))
+        dimensions[name] = {
+            "values": unique,
+            "labels": (
+                [run_labels[value] for value in unique] if name == 'run'
+                else unique if name == 'page'
+                else [format_cell_value(value) for value in unique]
+            ),
+        }
+        codes.append(pd.Categorical(values, categories=unique).codes.tolist())
+
+    scores = [
+        [None if score != score else int(round(score)) for score in wide[label]]
+        for label in METRIC_LABELS
+    ]
+    return {
+        "generated": datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC'),
+        "metrics": METRIC_LABELS,
+        "dimensions": dimensions,
+        "rows": [list(row) for row in zip(*codes, *scores)],
+    }
+
+@timed('dashboard')
+def build_dashboard(metrics='Metrics', output_path=None):
+    """
+    Write a single self-contained HTML dashboard of the metrics store.
+
+    The scores are embedded as JSON and drawn in the browser as SVG, with
+    filters by category, page, mode, device and run, so nothing is rendered
+    ahead of time and the file opens offline.
+
+    :param metrics: Metrics directory or store path
+    :param output_path: Where to write the page, DASHBOARD_FILE in the metrics directory by default
+    :return: Path of the dashboard
+    """
+    if output_path is None:
+        metrics_dir = metrics if os.path.isdir(metrics) else os.path.dirname(metrics) or '.'
+        output_path = os.path.join(metrics_dir, DASHBOARD_FILE)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+
+    # '</' cannot appear inside a script element, so escape it in page names and labels
+    data = json.dumps(dashboard_data(metrics), separators=(',', ':')).replace('</', '<\\/')
+    with open(DASHBOARD_TEMPLATE_PATH, 'r', encoding='utf-8') as template_file:
+        page = template_file.read().replace(DASHBOARD_DATA_MARKER, data)
+
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as dashboard_file:
+        dashboard_file.write(page)
+    os.replace(temp_path, output_path)
+    print(f"Dashboard saved to: {output_path}")
+    return output_path
+
+def run_plots(metrics_dir, output_dir, kinds, **render_options):
+    """Render the requested plot kinds from the metrics store"""
+    # Load the store once and share it between the plot builders
+    frame = load_metrics_frame(metrics_dir)
+    plot_builders = {
+        'pages': create_plots,
+        'comparison': create_comparison_plots,
+        'summary': create_summary_plot,
+    }
+    for kind in kinds:
+        plot_builders[kind](frame, output_dir, **render_options)
+
+def build_parser():
+    """Build the command line interface; every subcommand defaults to the repo's usual paths"""
+    parser = argparse.ArgumentParser(description="Extract, merge, tabulate and plot Lighthouse report scores")
+    parser.add_argument('--summary', help=f"Where to write the run summary, {RUN_SUMMARY} in the output directory by default")
+    parser.add_argument('--profile', metavar='DIR',
+                        help="Profile each stage with cProfile and tracemalloc and dump the profiles to DIR")
+    subparsers = parser.add_subparsers(dest='command')
+
+    extract = subparsers.add_parser('extract', help="Extract scores from HTML and .json.gz reports, then merge them")
+    extract.add_argument('--reports-dir', default='Reports')
+    extract.add_argument('--output-dir', default='Metrics')
+    extract.add_argument('--parser', choices=['lhr', 'ocr'], default='lhr',
+                         help="lhr reads the JSON embedded in each report and only uses OCR without it")
+    extract.add_argument('--ocr-engine', choices=['tesseract', 'template'], default='tesseract')
+    extract.add_argument('--workers', type=int, default=1)
+    extract.add_argument('--full', action='store_true', help="Re-extract reports that did not change")
+    extract.add_argument('--report-timeout', type=float, default=REPORT_TIME_BUDGET,
+                         help="Seconds each report may take in the browser before it is retried")
+    extract.add_argument('--retries', type=int, default=REPORT_RETRIES,
+                         help="How many more times a report that failed is attempted")
+
+    merge = subparsers.add_parser('merge', help="Merge per-report JSON files into the metrics store")
+    merge.add_argument('--output-dir', default='Metrics')
+    merge.add_argument('--full', action='store_true', help="Re-read files that did not change")
+    merge.add_argument('--legacy-json', action='store_true', help="Also write the nested merged_data.json")
+
+    tabulate = subparsers.add_parser('tabulate', help="Write the score and percentage Excel tables")
+    tabulate.add_argument('--metrics-dir', default='Metrics')
+    tabulate.add_argument('--parsed-output', default='parsed_data.xlsx')
+    tabulate.add_argument('--percentage-output', default='metric.xlsx')
+
+    export = subparsers.add_parser('export', help="Write every table to one multi-sheet workbook")
+    export.add_argument('--metrics-dir', default='Metrics')
+    export.add_argument('--output', help=f"Workbook path, {EXPORT_WORKBOOK} in the metrics directory by default")
+    export.add_argument('--csv', action='store_true', help="Also save every sheet as CSV")
+    export.add_argument('--parquet', action='store_true', help="Also save every sheet as Parquet")
+
+    dashboard = subparsers.add_parser('dashboard', help="Write a self-contained HTML dashboard of all runs")
+    dashboard.add_argument('--metrics-dir', default='Metrics')
+    dashboard.add_argument('--output', help=f"Dashboard path, {DASHBOARD_FILE} in the metrics directory by default")
+
+    regressions = subparsers.add_parser('regressions', help="List scores that dropped below their recent baseline")
+    regressions.add_argument('--metrics-dir', default='Metrics')
+    regressions.add_argument('--window', type=int, default=5, help="Previous runs the baseline averages over")
+    regressions.add_argument('--threshold', type=float, default=10, help="Points below baseline to flag")
+    regressions.add_argument('--since', help="Only runs at or after this ISO timestamp")
+    regressions.add_argument('--days', type=float, help="Only runs from the last N days")
+    regressions.add_argument('--metric', choices=METRIC_LABELS)
+    regressions.add_argument('--all', action='store_true', help="Show every run, not only flagged ones")
+    regressions.add_argument('--output', help="Also save the result as .csv or .xlsx")
+
+    calibrate = subparsers.add_parser(
+        'calibrate', help="Build the OCR glyph set from HTML reports that embed their Lighthouse JSON"
+    )
+    calibrate.add_argument('--reports-dir', default='Reports')
+    calibrate.add_argument('--glyphs', default=GLYPH_TEMPLATE_PATH, help="Where to save the glyph set")
+    calibrate.add_argument('--limit', type=int, default=200, help="Most reports rendered")
+    calibrate.add_argument('--holdout', type=float, default=0.25,
+                           help="Share of reports kept aside to measure the accuracy")
+
+    plot = subparsers.add_parser('plot', help="Render plots from the metrics store")
+    plot.add_argument('--metrics-dir', default='Metrics')
+    plot.add_argument('--output-dir', default='Plots')
+    plot.add_argument('--kind', dest='kinds', action='append', choices=['pages', 'comparison', 'summary'],
+                      help="Plot kinds to render, all by default; repeat for several")
+    plot.add_argument('--dpi', type=int, default=300)
+    plot.add_argument('--format', dest='fmt', default='png')
+    plot.add_argument('--workers', type=int, default=None)
+    plot.add_argument('--full', action='store_true', help="Re-render figures whose data did not change")
+
+    return parser
+
+def main(argv=None):
+    """Command line entry point"""
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        # No subcommand: extract and merge with the defaults
+        args = build_parser().parse_args(['extract'], namespace=args)
+        args.command = 'extract'
+
+    started_at = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    if args.profile:
+        enable_profiling(args.profile)
+
+    if args.command == 'extract':
+        process_reports_directory(
+            args.reports_dir, args.output_dir, parser=args.parser, workers=args.workers,
+            incremental=not args.full, ocr_engine=args.ocr_engine, report_timeout=args.report_timeout,
+            retries=args.retries,
+        )
+    elif args.command == 'merge':
+        merge_json_files(args.output_dir, incremental=not args.full, legacy_json=args.legacy_json)
+    elif args.command == 'tabulate':
+        frame = load_metrics_frame(args.metrics_dir)
+        parse_json_to_dataframe(frame, args.parsed_output, load_timings_frame(args.metrics_dir))
+        calculate_metric_percentage(frame, args.percentage_output)
+    elif args.command == 'export':
+        export_workbook(args.metrics_dir, args.output, csv=args.csv, parquet=args.parquet)
+    elif args.command == 'dashboard':
+        build_dashboard(args.metrics_dir, args.output)
+    elif args.command == 'regressions':
+        since = args.since
+        if args.days is not None:
+            since = datetime.now(timezone.utc) - timedelta(days=args.days)
+        result = find_regressions(args.metrics_dir, args.window, args.threshold, since, args.metric)
+        if not args.all:
+            result = result[result['regression']]
+        print(result.to_string(index=False))
+        if args.output:
+            if args.output.endswith('.csv'):
+                result.to_csv(args.output, index=False)
+            else:
+                # Excel cannot store timezone-aware timestamps
+                result.assign(run_timestamp=result['run_timestamp'].dt.tz_localize(None)).to_excel(
+                    args.output, index=False
+                )
+    elif args.command == 'calibrate':
+        calibrate_glyph_templates(args.reports_dir, args.glyphs, args.limit, args.holdout)
+    elif args.command == 'plot':
+        run_plots(
+            args.metrics_dir, args.output_dir, args.kinds or ['pages', 'comparison', 'summary'],
+            dpi=args.dpi, fmt=args.fmt, workers=args.workers, incremental=not args.full,
+        )
+
+    summary_dir = (getattr(args, 'output_dir', None) or getattr(args, 'metrics_dir', None)
+                   or os.path.dirname(args.glyphs))
+    write_run_summary(
+        args.summary or os.path.join(summary_dir, RUN_SUMMARY), args.command, started_at,
+        time.perf_counter() - started,
+    )
 
 if __name__ == '__main__':
-    process_reports_directory()
\ No newline at end of file
+    main()
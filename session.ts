@@ -0,0 +1,154 @@
+import puppeteerExtra from "puppeteer-extra";
+import puppeteerExtraPluginStealth from "puppeteer-extra-plugin-stealth";
+import type { Browser, Cookie } from "puppeteer";
+import { writeFileSync, readFileSync, existsSync, renameSync } from "fs";
+import { join } from "path";
+
+puppeteerExtra.use(puppeteerExtraPluginStealth());
+import dotenv from "dotenv";
+dotenv.config();
+
+const ERP_USER = process.env.ERP_EMAIL;
+const ERP_PWD = process.env.ERP_PWD;
+export const ERP_URL = "https://erp.agnikul.in";
+
+// Cookies of the last login, reused by later runs until they expire
+const SESSION_FILE = join(process.cwd(), "session.json");
+// Logged-in page that answers 200 only while the session is valid; anything else means log in again
+const SESSION_CHECK_URL = process.env.SESSION_CHECK_URL ?? `${ERP_URL}/api/method/frappe.auth.get_logged_user`;
+// A successful check is trusted this long, so checking before every audit stays cheap
+const SESSION_CHECK_INTERVAL_MS = Number(process.env.SESSION_CHECK_INTERVAL_MS ?? 60000);
+// Cookies expiring within this margin are treated as expired, so no audit starts on a dying session
+const SESSION_EXPIRY_MARGIN_MS = 5 * 60 * 1000;
+const SESSION_LOGIN_TIMEOUT_MS = 120000;
+
+type StoredSession = { savedAt: string; expiresAt: string | null; cookies: Cookie[] };
+
+/**
+ * Logs in to the ERP once and shares the session cookies between the sitemap crawler and the audits.
+ *
+ * The cookies are saved with their expiry and reused across runs. Before they are handed out, the
+ * expiry is checked in memory and, at most every SESSION_CHECK_INTERVAL_MS, a cheap request confirms
+ * the server still accepts them. An expired or rejected session is replaced by a new login, which
+ * concurrent callers wait for together instead of each logging in.
+ */
+export class SessionManager {
+  private session: StoredSession | null = null;
+  private checkedAt = 0;
+  private pending: Promise<StoredSession> | null = null;
+
+  constructor(private sessionFile: string = SESSION_FILE) {
+    this.session = this.load();
+  }
+
+  async getCookies(): Promise<Cookie[]> {
+    return (await this.getSession()).cookies;
+  }
+
+  async getCookieHeader(): Promise<string> {
+    return (await this.getSession()).cookies.map((cookie) => `${cookie.name}=${cookie.value}`).join("; ");
+  }
+
+  // Forget the session, e.g. after a page redirected to the login, so the next caller logs in again
+  invalidate(): void {
+    this.session = null;
+    this.checkedAt = 0;
+  }
+
+  async getSession(): Promise<StoredSession> {
+    // Callers arriving while a check or login is in flight share its result
+    if (!this.pending) {
+      this.pending = this.refresh().finally(() => {
+        this.pending = null;
+      });
+    }
+    return this.pending;
+  }
+
+  async refresh(): Promise<StoredSession> {
+    if (this.session && !this.isExpired(this.session) && (await this.isValid(this.session))) {
+      return this.session;
+    }
+    return this.login();
+  }
+
+  isExpired(session: StoredSession): boolean {
+    return session.expiresAt !== null && Date.parse(session.expiresAt) - SESSION_EXPIRY_MARGIN_MS <= Date.now();
+  }
+
+  async isValid(session: StoredSession): Promise<boolean> {
+    if (Date.now() - this.checkedAt < SESSION_CHECK_INTERVAL_MS) {
+      return true;
+    }
+    try {
+      const response = await fetch(SESSION_CHECK_URL, {
+        headers: { Cookie: session.cookies.map((cookie) => `${cookie.name}=${cookie.value}`).join("; ") },
+        redirect: "manual",
+      });
+      if (!response.ok) {
+        console.log(`Session rejected (HTTP ${response.status}), logging in again.`);
+        return false;
+      }
+    } catch (error) {
+      // Without an answer the session is kept; an audit that lands on the login page invalidates it
+      console.error("Could not check the session:", error);
+    }
+    this.checkedAt = Date.now();
+    return true;
+  }
+
+  async login(): Promise<StoredSession> {
+    const browser: Browser = await puppeteerExtra.launch({ headless: true });
+    try {
+      const page = await browser.newPage();
+      await page.goto(`${ERP_URL}/login`, { waitUntil: "networkidle2" });
+
+      await page.type("#login_email", ERP_USER);
+      await page.type("#login_password", ERP_PWD);
+
+      await page.waitForFunction(
+        'document.querySelector("#login-button").disabled === false',
+        { timeout: SESSION_LOGIN_TIMEOUT_MS }
+      );
+
+      await page.click("#login-button");
+      await page.waitForNavigation({ waitUntil: "networkidle2", timeout: SESSION_LOGIN_TIMEOUT_MS });
+      if (new URL(page.url()).pathname.startsWith("/login")) {
+        throw new Error("Login failed, check ERP_EMAIL and ERP_PWD");
+      }
+
+      const cookies = await page.cookies();
+      // Session cookies (expires -1) last as long as the server allows, so only dated ones bound the expiry
+      const expiries = cookies.filter((cookie) => cookie.expires > 0).map((cookie) => cookie.expires * 1000);
+      this.session = {
+        savedAt: new Date().toISOString(),
+        expiresAt: expiries.length > 0 ? new Date(Math.min(...expiries)).toISOString() : null,
+        cookies,
+      };
+      this.checkedAt = Date.now();
+      this.save(this.session);
+      console.log(`Logged in, session valid until ${this.session.expiresAt ?? "the server ends it"}.`);
+      return this.session;
+    } finally {
+      await browser.close();
+    }
+  }
+
+  load(): StoredSession | null {
+    if (!existsSync(this.sessionFile)) {
+      return null;
+    }
+    try {
+      return JSON.parse(readFileSync(this.sessionFile, "utf-8"));
+    } catch (error) {
+      console.error("Error reading the saved session, logging in again:", error);
+      return null;
+    }
+  }
+
+  save(session: StoredSession): void {
+    // Replace the file atomically so a crash never leaves it half written
+    writeFileSync(`${this.sessionFile}.tmp`, JSON.stringify(session, null, 2), { mode: 0o600 });
+    renameSync(`${this.sessionFile}.tmp`, this.sessionFile);
+  }
+}
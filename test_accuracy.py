@@ -0,0 +1,81 @@
+# Ground-truth checks on the synthetic corpus of benchmark_extractor.py: every score the
+# pipeline reads must be exactly the one the corpus was generated with.
+# Run with: python -m pytest
+import random
+import shutil
+
+import pytest
+
+import benchmark_extractor as benchmark
+import lighthouse_metrics_extractor as extractor
+
+def test_lhr_scores_from_html_and_json_gz(tmp_path):
+    generated = benchmark.generate_lhr_reports(str(tmp_path / 'Reports'), 12, padding_kb=1, seed=1)
+    for html_path, json_path, scores in generated:
+        expected = dict(zip(extractor.METRIC_LABELS, scores))
+        assert extractor.extract_scores_from_lhr(extractor.load_lhr_from_html(html_path)) == expected
+        assert extractor.extract_scores_from_lhr(extractor.load_lhr(json_path)) == expected
+
+def test_extract_report_reads_lhr_without_browser(tmp_path):
+    html_path, json_path, scores = benchmark.generate_lhr_reports(str(tmp_path / 'Reports'), 1, padding_kb=1)[0]
+    output_dir = tmp_path / 'Metrics'
+    output_dir.mkdir()
+    for path in (html_path, json_path):
+        assert extractor.extract_report(path, str(output_dir))['extracted_numbers'] == scores
+
+def synthetic_screenshots(images, seed):
+    rng = random.Random(seed)
+    screenshots = []
+    for index in range(images):
+        scores = benchmark.synthetic_scores(rng)
+        screenshots.append((benchmark.render_gauge_screenshot(scores, seed + index), scores))
+    return screenshots
+
+@pytest.fixture(scope='module')
+def calibrated_glyphs(tmp_path_factory):
+    """Glyph set calibrated from gauges with known scores, like the calibrate command does."""
+    template_path = str(tmp_path_factory.mktemp('glyphs') / 'digits.npz')
+    screenshots = synthetic_screenshots(30, seed=100)
+    crops = [crop for image, scores in screenshots for crop in benchmark.gauge_crops(image, len(scores))]
+    extractor.save_glyph_templates(crops, [score for _, scores in screenshots for score in scores], template_path)
+    return template_path
+
+def test_template_digits_on_known_gauge_positions(calibrated_glyphs):
+    # No gauge may fall through to Tesseract: it would read nothing and fail the comparison
+    tess_api = benchmark.NoTesseract()
+    for image, scores in synthetic_screenshots(20, seed=0):
+        crops = benchmark.gauge_crops(image, len(scores))
+        numbers = extractor.recognize_gauges(crops, tess_api, 'template', template_path=calibrated_glyphs)
+        assert numbers == scores
+    assert tess_api.reads == 0
+
+def test_template_digits_on_circle_search(calibrated_glyphs):
+    for image, scores in synthetic_screenshots(10, seed=50):
+        crops = extractor.locate_gauge_crops(image)
+        numbers = extractor.recognize_gauges(crops, benchmark.NoTesseract(), 'template',
+                                             template_path=calibrated_glyphs)
+        # Circles come back in no particular order
+        assert sorted(numbers) == sorted(scores)
+
+@pytest.mark.skipif(shutil.which('tesseract') is None, reason="Tesseract not installed")
+def test_tesseract_digits_on_known_gauge_positions():
+    for image, scores in synthetic_screenshots(10, seed=0):
+        assert extractor.recognize_gauges(benchmark.gauge_crops(image, len(scores))) == scores
+
+def test_merge_round_trip(tmp_path):
+    metrics_dir = str(tmp_path / 'Metrics')
+    truth = benchmark.generate_metrics_tree(metrics_dir, 90, runs=2, seed=3)
+    extractor.merge_json_files(metrics_dir)
+
+    frame = extractor.load_metrics_frame(metrics_dir)
+    stored = {
+        (row.category, row.page, row.mode, row.device, row.run_timestamp.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+         row.metric): row.score
+        for row in frame.itertuples()
+    }
+    expected = {
+        key + (metric,): score
+        for key, scores in truth.items()
+        for metric, score in zip(extractor.METRIC_LABELS, scores)
+    }
+    assert stored == expected
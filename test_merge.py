@@ -0,0 +1,136 @@
+# Tests of the metrics merge: file name parsing, incremental reruns and the regression query.
+# Run with: python -m pytest
+import json
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import lighthouse_metrics_extractor as extractor
+
+def write_metric_file(root, relative_path, numbers, mtime=None):
+    path = os.path.join(root, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as json_file:
+        json.dump({"extracted_numbers": numbers, "source": "lhr"}, json_file)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+@pytest.mark.parametrize('relative_path, expected', [
+    ('2026-01-01T10-00-00.000Z/Fleet/home/navigation_mode/home_navigation_desktop.json',
+     ('2026-01-01T10-00-00.000Z', 'Fleet', 'home', 'navigation_mode', 'desktop')),
+    ('Fleet/vehicle_list/navigation_mode/vehicle_list_navigation_mobile.json',
+     (None, 'Fleet', 'vehicle_list', 'navigation_mode', 'mobile')),
+    ('Quality_Desk/open_ncr_report/timespan_mode/open_ncr_report_timespan_tablet.json',
+     (None, 'Quality_Desk', 'open_ncr_report', 'timespan_mode', 'tablet')),
+    # Without a mode folder the mode comes from the file name
+    ('home/home_snapshot_desktop.json',
+     (None, extractor.DEFAULT_CATEGORY, 'home', 'snapshot', 'desktop')),
+    ('2026-01-01T10-00-00.000Z/stock_entry/stock_entry_snapshot_mobile.json',
+     ('2026-01-01T10-00-00.000Z', extractor.DEFAULT_CATEGORY, 'stock_entry', 'snapshot', 'mobile')),
+])
+def test_read_metric_file_parses_path(tmp_path, relative_path, expected):
+    write_metric_file(str(tmp_path), relative_path, [1, 2, 3, 4])
+    record, error = extractor.read_metric_file(str(tmp_path), relative_path)
+    assert error is None
+    assert (record['run'], record['category'], record['page'], record['mode'], record['device']) == expected
+    assert record['numbers'] == [1, 2, 3, 4]
+
+def test_read_metric_file_rejects_unknown_layout(tmp_path):
+    write_metric_file(str(tmp_path), 'loose.json', [1, 2, 3, 4])
+    record, error = extractor.read_metric_file(str(tmp_path), 'loose.json')
+    assert record is None
+    assert error['stage'] == 'path'
+
+RUN = '2026-01-01T10-00-00.000Z'
+KEPT = f'{RUN}/Fleet/home/navigation_mode/home_navigation_desktop.json'
+CHANGED = f'{RUN}/Fleet/home/navigation_mode/home_navigation_mobile.json'
+REMOVED = f'{RUN}/Fleet/home/navigation_mode/home_navigation_tablet.json'
+BROKEN = f'{RUN}/Fleet/stock/navigation_mode/stock_navigation_desktop.json'
+
+def stored_scores(metrics_dir):
+    frame = extractor.load_metrics_frame(metrics_dir)
+    return {(row.source, row.metric): row.score for row in frame.itertuples()}
+
+def history_scores(metrics_dir):
+    connection = sqlite3.connect(os.path.join(metrics_dir, extractor.HISTORY_STORE))
+    try:
+        return {(source, metric): score
+                for source, metric, score in connection.execute("SELECT source, metric, score FROM scores")}
+    finally:
+        connection.close()
+
+def test_incremental_merge_updates_changed_and_drops_removed(tmp_path):
+    metrics_dir = str(tmp_path)
+    write_metric_file(metrics_dir, KEPT, [10, 20, 30, 40], mtime=1000)
+    write_metric_file(metrics_dir, CHANGED, [11, 21, 31, 41], mtime=1000)
+    write_metric_file(metrics_dir, REMOVED, [12, 22, 32, 42], mtime=1000)
+    extractor.merge_json_files(metrics_dir)
+    assert len(stored_scores(metrics_dir)) == 12
+
+    write_metric_file(metrics_dir, CHANGED, [50, 60, 70, 80], mtime=2000)
+    os.remove(os.path.join(metrics_dir, REMOVED))
+    path = os.path.join(metrics_dir, BROKEN)
+    os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as broken_file:
+        broken_file.write('{"extracted_numbers": [1, 2')
+    extractor.merge_json_files(metrics_dir)
+
+    expected = {
+        **{(KEPT, metric): score for metric, score in zip(extractor.METRIC_LABELS, [10, 20, 30, 40])},
+        **{(CHANGED, metric): score for metric, score in zip(extractor.METRIC_LABELS, [50, 60, 70, 80])},
+    }
+    assert stored_scores(metrics_dir) == expected
+    assert history_scores(metrics_dir) == expected
+
+    with open(os.path.join(metrics_dir, extractor.MERGE_ERRORS)) as errors_file:
+        errors = json.load(errors_file)['errors']
+    assert [(error['path'], error['stage']) for error in errors] == [(BROKEN, 'read')]
+    # The broken file stays out of the manifest, so the next merge tries it again
+    with open(os.path.join(metrics_dir, extractor.MERGE_MANIFEST)) as manifest_file:
+        assert sorted(json.load(manifest_file)['files']) == sorted([KEPT, CHANGED])
+
+def test_merge_of_empty_directory_writes_empty_store(tmp_path):
+    store_path = extractor.merge_json_files(str(tmp_path))
+    assert os.path.exists(store_path)
+    assert len(extractor.load_metrics_frame(store_path)) == 0
+
+@pytest.fixture
+def performance_history(tmp_path):
+    """One page whose Performance score is 90, 90, 80 and 70 over four daily runs."""
+    metrics_dir = str(tmp_path)
+    for day, performance in enumerate([90, 90, 80, 70], start=1):
+        write_metric_file(
+            metrics_dir, f'2026-01-0{day}T10-00-00.000Z/Fleet/home/navigation_mode/home_navigation_desktop.json',
+            [100, 100, 100, performance],
+        )
+    extractor.merge_json_files(metrics_dir)
+    return metrics_dir
+
+def test_find_regressions_window_and_threshold(performance_history):
+    result = extractor.find_regressions(performance_history, window=2, threshold=10, metric='Performance')
+    assert result['score'].tolist() == [90, 90, 80, 70]
+    # The first run of a page has nothing to compare with
+    assert pd.isna(result['delta'][0]) and pd.isna(result['baseline'][0])
+    assert not result['regression'][0]
+    assert result['delta'][1:].tolist() == [0, -10, -10]
+    # The baseline averages the two runs before, not the run itself or older ones
+    assert result['baseline'][1:].tolist() == [90, 90, 85]
+    # A drop of exactly the threshold is not flagged, one beyond it is
+    assert result['drop'][2] == 10 and not result['regression'][2]
+    assert result['drop'][3] == 15 and result['regression'][3]
+
+def test_find_regressions_since_keeps_earlier_runs_as_baseline(performance_history):
+    result = extractor.find_regressions(performance_history, window=5, threshold=10,
+                                        since='2026-01-03T10:00:00', metric='Performance')
+    assert result['run_timestamp'].tolist() == [
+        pd.Timestamp('2026-01-03T10:00:00', tz='UTC'), pd.Timestamp('2026-01-04T10:00:00', tz='UTC'),
+    ]
+    assert result['baseline'].tolist() == [90, pytest.approx(260 / 3)]
+    assert result['regression'].tolist() == [False, True]
+
+def test_find_regressions_without_metric_returns_every_metric(performance_history):
+    result = extractor.find_regressions(performance_history, window=2, threshold=10)
+    assert len(result) == 4 * len(extractor.METRIC_LABELS)
+    assert set(result.loc[result['regression'], 'metric']) == {'Performance'}